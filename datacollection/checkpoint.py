@@ -0,0 +1,91 @@
+import json
+import os
+
+
+class Checkpoint:
+    """
+    The class Checkpoint stores the progress of a long running collection in a json file, so that a collection that
+    crashed can be resumed where it stopped. For each step of the collection it stores the current phase, the position
+    within the phase and the sizes of the files that were written up to this position. When a step is resumed, its
+    files are truncated to these sizes, so that no row is written twice.
+    """
+
+    def __init__(self, file):
+        """
+        Constructor, loads the progress of a previous run if the file exists
+        :param file: Name of the json file to store the progress in
+        """
+        self.file = file
+        self.steps = {}
+        if os.path.exists(file):
+            with open(file, encoding="utf-8") as f:
+                self.steps = json.load(f)["steps"]
+
+    def resume(self, step, files):
+        """
+        Returns the progress of an unfinished step and truncates its files to the sizes stored with it
+        :param step: Name of the step
+        :param files: Names of the files that are written by the step
+        :return: Tuple (phase, position) or None if the step has to start from the beginning
+        """
+        progress = self.steps.get(step)
+        if progress is None or progress["done"] or sorted(progress["sizes"]) != sorted(files) or \
+                not all(os.path.exists(file) for file in files):
+            return None
+        for file, size in progress["sizes"].items():
+            os.truncate(file, size)
+        return progress["phase"], progress["position"]
+
+    def is_finished(self, step, files):
+        """
+        Whether a step was finished by a previous run and its files are still complete
+        :param step: Name of the step
+        :param files: Names of the files that are written by the step
+        :return: Boolean
+        """
+        progress = self.steps.get(step)
+        return progress is not None and progress["done"] and sorted(progress["sizes"]) == sorted(files) and \
+            all(os.path.exists(file) and os.path.getsize(file) == size for file, size in progress["sizes"].items())
+
+    def save(self, step, phase, position, files, done=False):
+        """
+        Stores the progress of a step, all rows up to the position have to be flushed into the files
+        :param step: Name of the step
+        :param phase: Name of the current phase of the step
+        :param position: Number of finished items or pages in the current phase
+        :param files: Names of the files that are written by the step
+        :param done: Whether the step is finished
+        :return:
+        """
+        self.steps[step] = {"phase": phase, "position": position, "done": done,
+                            "sizes": {file: os.path.getsize(file) for file in files}}
+        # The file is replaced atomically so that a crash never leaves a broken checkpoint behind
+        temporary_file = self.file + ".tmp"
+        with open(temporary_file, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps}, f)
+        os.replace(temporary_file, self.file)
+
+    def remove(self):
+        """
+        Deletes the checkpoint once the whole collection is finished
+        :return:
+        """
+        self.steps = {}
+        if os.path.exists(self.file):
+            os.remove(self.file)
+
+
+def phase_start(progress, phases, phase):
+    """
+    Determines where a phase of a resumed step starts
+    :param progress: Tuple (phase, position) returned by Checkpoint.resume or None
+    :param phases: List of the names of the phases of the step in their order
+    :param phase: Name of the phase
+    :return: Number of finished items or pages of the phase or None if the whole phase was finished
+    """
+    if progress is None:
+        return 0
+    current = phases.index(progress[0])
+    if phases.index(phase) < current:
+        return None
+    return progress[1] if phases.index(phase) == current else 0
@@ -0,0 +1,358 @@
+import base64
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Tokens of a GraphQL document, commas and comments are ignored like whitespace
+_TOKEN = re.compile(r'\s+|,|#[^\n]*|(\.\.\.|[{}():\[\]!$=@]|"(?:[^"\\]|\\.)*"|-?\d+|[_A-Za-z][_0-9A-Za-z]*)')
+
+# Timeline items of GitHub's schema that are members of PullRequestTimelineItems but not of IssueTimelineItems. Like
+# GitHub, queries requesting them from the timeline of an issue are rejected as invalid
+_PULL_REQUEST_TIMELINE_ITEMS = {"AddedToMergeQueueEvent", "AutoMergeDisabledEvent", "AutoMergeEnabledEvent",
+                                "AutoRebaseEnabledEvent", "AutoSquashEnabledEvent", "AutomaticBaseChangeFailedEvent",
+                                "AutomaticBaseChangeSucceededEvent", "BaseRefChangedEvent", "BaseRefDeletedEvent",
+                                "BaseRefForcePushedEvent", "ConvertToDraftEvent", "DeployedEvent",
+                                "DeploymentEnvironmentChangedEvent", "HeadRefDeletedEvent", "HeadRefForcePushedEvent",
+                                "HeadRefRestoredEvent", "MergedEvent", "PullRequestCommit",
+                                "PullRequestCommitCommentThread", "PullRequestReview", "PullRequestReviewThread",
+                                "PullRequestRevisionMarker", "ReadyForReviewEvent", "RemovedFromMergeQueueEvent",
+                                "ReviewDismissedEvent", "ReviewRequestRemovedEvent", "ReviewRequestedEvent"}
+
+
+class FakeGraphQLServer:
+    """
+    The class FakeGraphQLServer is a local stand-in for GitHub's GraphQL API, to run the GraphQL backend of
+    GitHubRepo without a network connection or rate limit. It serves the issues and pull requests of a fixture on
+    http://host:port/graphql in a background thread and executes the subset of GraphQL the backend uses: aliases,
+    arguments, variables, inline fragments and cursor pagination of the connections with first, after and itemTypes.
+    Item types and fragments of pull request timeline items on the timeline of an issue are rejected as by GitHub.
+
+    The fixture maps (owner, repo) to a dictionary mapping the number of each issue or pull request to its node. Nodes
+    are dictionaries with a __typename and the fields of GitHub's schema, connections are lists of nodes, e.g.
+    {"__typename": "PullRequest", "number": 1, "comments": [...], "reviews": [...], "timelineItems": [...]}. Nodes with
+    an id can be requested with node(id:). Users are requested with user(login:) from an optional second fixture.
+    """
+
+    def __init__(self, repositories, users=None, host="127.0.0.1", port=0):
+        """
+        Constructor, the server is started with start
+        :param repositories: Dictionary mapping tuples (owner, repo) to dictionaries mapping numbers to nodes
+        :param users: Optional dictionary mapping login names to User nodes, missing users are returned as null
+        :param host: Host to serve on
+        :param port: Port to serve on, 0 selects a free port
+        """
+        self.repositories = repositories
+        self.users = users or {}
+        self.requests = 0
+        self._nodes = {}
+        for issues in repositories.values():
+            for issue in issues.values():
+                _index_nodes(issue, self._nodes)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        Getter for the URL of the GraphQL end point, to be passed as graphql_url to GitHubRepo
+        :return: String containing the URL
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/graphql"
+
+    def start(self):
+        """
+        Starts serving in a background thread
+        :return:
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving and closes the socket
+        :return:
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def execute(self, query, variables=None):
+        """
+        Executes a query against the fixture
+        :param query: String containing the GraphQL query
+        :param variables: Optional dictionary of the values of the variables of the query
+        :return: Dictionary with the key data, or errors if the query could not be parsed or is invalid
+        """
+        with self._lock:
+            self.requests += 1
+        root = {"repository": self.__repository, "node": lambda id: self._nodes.get(id),
+                "user": lambda login: self.users.get(login)}
+        try:
+            return {"data": _resolve(root, _Parser(query, variables or {}).parse_document())}
+        except (ValueError, KeyError) as e:
+            return {"errors": [{"message": str(e)}]}
+
+    def __repository(self, owner, name):
+        """
+        Resolves the repository field of the query root
+        :param owner: Owner name of the repo
+        :param name: Name of the repo
+        :return: Dictionary of the repository or None if it is not part of the fixture
+        """
+        issues = self.repositories.get((owner, name))
+        if issues is None:
+            return None
+        return {"__typename": "Repository", "issueOrPullRequest": lambda number: issues.get(number),
+                "issue": lambda number: _of_type(issues.get(number), "Issue"),
+                "pullRequest": lambda number: _of_type(issues.get(number), "PullRequest")}
+
+
+def _handler(server):
+    """
+    Creates the request handler class of a FakeGraphQLServer
+    :param server: FakeGraphQLServer that executes the queries
+    :return: Subclass of BaseHTTPRequestHandler
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_POST(self):
+            if self.path != "/graphql":
+                self.send_error(404)
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            body = json.dumps(server.execute(request.get("query", ""), request.get("variables"))).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            # The rate limit never runs out, the headers are sent as the TokenScheduler reads them
+            self.send_header("X-RateLimit-Remaining", "5000")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            self.send_header("X-RateLimit-Resource", "graphql")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _index_nodes(value, nodes):
+    """
+    Collects all nodes with an id of a fixture
+    :param value: Node, list of nodes or value of a field
+    :param nodes: Dictionary mapping ids to nodes that is filled
+    :return:
+    """
+    if isinstance(value, dict):
+        if "id" in value:
+            nodes[value["id"]] = value
+        for field in value.values():
+            _index_nodes(field, nodes)
+    elif isinstance(value, list):
+        for item in value:
+            _index_nodes(item, nodes)
+
+
+def _of_type(node, type_name):
+    """
+    Returns the node if it has the type, e.g. for the issue field that does not return pull requests
+    :param node: Dictionary of the node or None
+    :param type_name: Name of the GraphQL type
+    :return: The node or None
+    """
+    return node if node is not None and node.get("__typename") == type_name else None
+
+
+def _resolve(node, selections):
+    """
+    Resolves the selections of a query on a node of the fixture
+    :param node: Dictionary of the node, fields may be functions that take the arguments of the field
+    :param selections: List of the selections parsed by _Parser
+    :return: Dictionary mapping the aliases to the resolved values
+    """
+    result = {}
+    for selection in selections:
+        if selection[0] == "fragment":
+            if node.get("__typename") == selection[1]:
+                result.update(_resolve(node, selection[2]))
+            continue
+        _, alias, name, arguments, sub_selections = selection
+        if name == "timelineItems":
+            _validate_timeline(node.get("__typename"), arguments, sub_selections)
+        value = node.get(name)
+        if callable(value):
+            value = value(**arguments)
+        elif isinstance(value, list) and ("first" in arguments or "after" in arguments):
+            value = _connection(value, arguments)
+        result[alias] = _complete(value, sub_selections)
+    return result
+
+
+def _validate_timeline(type_name, arguments, selections):
+    """
+    Checks that the item types and the fragments of the nodes of a timeline selection belong to the timeline of the
+    type, only pull requests have the pull request timeline items
+    :param type_name: GraphQL type of the node whose timeline is selected
+    :param arguments: Dictionary of the arguments of the timelineItems field
+    :param selections: List of the selections of the timelineItems field
+    :return:
+    """
+    if type_name == "PullRequest":
+        return
+    invalid = [item_type for item_type in arguments.get("itemTypes", [])
+               if _type_name(item_type) in _PULL_REQUEST_TIMELINE_ITEMS]
+    for selection in selections or []:
+        if selection[0] == "field" and selection[2] == "nodes":
+            invalid.extend(sub_selection[1] for sub_selection in selection[4] or []
+                           if sub_selection[0] == "fragment" and sub_selection[1] in _PULL_REQUEST_TIMELINE_ITEMS)
+    if invalid:
+        raise ValueError(f"{', '.join(invalid)} are not timeline items of {type_name}")
+
+
+def _type_name(item_type):
+    """
+    GraphQL type of a value of the itemTypes enums, e.g. MergedEvent for MERGED_EVENT
+    :param item_type: Value of the enum
+    :return: String containing the type name
+    """
+    return "".join(part.capitalize() for part in item_type.split("_"))
+
+
+def _complete(value, selections):
+    """
+    Resolves the selections on the value of a field
+    :param value: Value of the field
+    :param selections: List of the selections of the field or None for scalars
+    :return: Resolved value
+    """
+    if value is None or selections is None:
+        return value
+    if isinstance(value, list):
+        return [_complete(item, selections) for item in value]
+    return _resolve(value, selections)
+
+
+def _connection(nodes, arguments):
+    """
+    Resolves a page of a connection
+    :param nodes: List of all nodes of the connection
+    :param arguments: Dictionary of the arguments first, after and itemTypes
+    :return: Dictionary with the nodes of the page, the page info and the total count
+    """
+    if "itemTypes" in arguments:
+        type_names = {_type_name(item_type) for item_type in arguments["itemTypes"]}
+        nodes = [node for node in nodes if node.get("__typename") in type_names]
+    start = int(base64.b64decode(arguments["after"])) + 1 if arguments.get("after") else 0
+    page = nodes[start:start + arguments.get("first", len(nodes))]
+    end_cursor = base64.b64encode(str(start + len(page) - 1).encode()).decode() if page else arguments.get("after")
+    return {"nodes": page, "totalCount": len(nodes),
+            "pageInfo": {"hasNextPage": start + len(page) < len(nodes), "endCursor": end_cursor}}
+
+
+class _Parser:
+    """
+    Parser of the subset of GraphQL queries that FakeGraphQLServer executes. Selections are parsed into tuples
+    ("field", alias, name, arguments, selections or None) and ("fragment", type name, selections)
+    """
+
+    def __init__(self, query, variables):
+        """
+        Constructor
+        :param query: String containing the GraphQL query
+        :param variables: Dictionary of the values of the variables of the query
+        """
+        self.tokens = [token for token in _TOKEN.findall(query) if token]
+        self.position = 0
+        self.variables = variables
+
+    def parse_document(self):
+        """
+        Parses a query with an optional operation name and variable definitions
+        :return: List of the selections of the query
+        """
+        if self.__peek() == "query":
+            self.position += 1
+            if self.__peek() not in ("(", "{"):
+                self.position += 1
+            if self.__peek() == "(":
+                # The variable definitions are not needed, the values are taken from the variables
+                depth = 0
+                while True:
+                    token = self.__next()
+                    depth += {"(": 1, ")": -1}.get(token, 0)
+                    if depth == 0:
+                        break
+        return self.__selection_set()
+
+    def __peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def __next(self):
+        if self.position >= len(self.tokens):
+            raise ValueError("Unexpected end of query")
+        self.position += 1
+        return self.tokens[self.position - 1]
+
+    def __expect(self, token):
+        if self.__next() != token:
+            raise ValueError(f"Expected {token} at token {self.position}")
+
+    def __selection_set(self):
+        self.__expect("{")
+        selections = []
+        while self.__peek() != "}":
+            selections.append(self.__selection())
+        self.__expect("}")
+        return selections
+
+    def __selection(self):
+        if self.__peek() == "...":
+            self.position += 1
+            self.__expect("on")
+            type_name = self.__next()
+            return "fragment", type_name, self.__selection_set()
+        alias = name = self.__next()
+        if self.__peek() == ":":
+            self.position += 1
+            name = self.__next()
+        arguments = {}
+        if self.__peek() == "(":
+            self.position += 1
+            while self.__peek() != ")":
+                argument = self.__next()
+                self.__expect(":")
+                arguments[argument] = self.__value()
+            self.position += 1
+        sub_selections = self.__selection_set() if self.__peek() == "{" else None
+        return "field", alias, name, arguments, sub_selections
+
+    def __value(self):
+        token = self.__next()
+        if token == "$":
+            return self.variables[self.__next()]
+        if token == "[":
+            values = []
+            while self.__peek() != "]":
+                values.append(self.__value())
+            self.position += 1
+            return values
+        if token.startswith('"'):
+            return json.loads(token)
+        if re.fullmatch(r"-?\d+", token):
+            return int(token)
+        return {"true": True, "false": False, "null": None}.get(token, token)
@@ -1,58 +1,498 @@
+import csv
+import json
+import os
 import re
-from datetime import datetime
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 
 import git
-import pandas as pd
 
+from datacollection.log_writer import open_log_writer
 
-def _initialize_csv(file):
+
+_COMMIT_LOG_COLUMNS = ["commit:hash",
+                       "commit:message",
+                       "commit:author:name",
+                       "commit:author:mail",
+                       "commit:committer:name",
+                       "commit:committer:mail",
+                       "timestamp:author:date",
+                       "timestamp:author:timezone",
+                       "timestamp:committer:date",
+                       "timestamp:committer:timezone",
+                       "timestamp:committer",
+                       "timestamp:author",
+                       "commit:is_merge",
+                       "activity",
+                       "issue:number"]
+
+# Optional change statistics of each commit, summed up over all changed files
+_NUMSTAT_COLUMNS = ["commit:files_changed",
+                    "commit:lines_added",
+                    "commit:lines_deleted"]
+
+# Long format table with one row for each file that was changed by a commit
+_FILE_CHANGES_COLUMNS = ["commit:hash",
+                         "file:path",
+                         "file:lines_added",
+                         "file:lines_deleted"]
+
+# Long format table with one row for each issue that is referenced by a commit
+_ISSUE_LINKS_COLUMNS = ["commit:hash",
+                        "issue:number"]
+
+# Column types of the typed output formats, the datetimes are stored as seconds since epoch
+_COMMIT_LOG_TYPES = {"commit:hash": "string",
+                     "commit:message": "string",
+                     "commit:author:name": "string",
+                     "commit:author:mail": "string",
+                     "commit:committer:name": "string",
+                     "commit:committer:mail": "string",
+                     "timestamp:author:date": "int64",
+                     "timestamp:author:timezone": "int64",
+                     "timestamp:committer:date": "int64",
+                     "timestamp:committer:timezone": "int64",
+                     "timestamp:committer": "int64",
+                     "timestamp:author": "int64",
+                     "commit:is_merge": "bool",
+                     "activity": "string",
+                     "issue:number": "int64_list",
+                     "commit:files_changed": "int64",
+                     "commit:lines_added": "int64",
+                     "commit:lines_deleted": "int64"}
+
+_FILE_CHANGES_TYPES = {"commit:hash": "string",
+                       "file:path": "string",
+                       "file:lines_added": "int64",
+                       "file:lines_deleted": "int64"}
+
+_ISSUE_LINKS_TYPES = {"commit:hash": "string",
+                      "issue:number": "int64"}
+
+
+def _initialize_csv(file, chunk_size=1000, append=False, numstat=False, output_format="csv"):
     """
     Creates an empty csv file with only the column names of the information that shall be stored by
     GitRepo.get_commit_information
     :param file: Name of the file that will be created
+    :param chunk_size: Number of commits that are buffered before they are written to the file
+    :param append: If True, the existing file is kept and the commits are appended to it
+    :param numstat: If True, the columns of the change statistics are added
+    :param output_format: Format of the file, one of log_writer.OUTPUT_FORMATS
+    :return: Buffered writer to append the commit information to the file
+    """
+    columns = _COMMIT_LOG_COLUMNS + _NUMSTAT_COLUMNS if numstat else _COMMIT_LOG_COLUMNS
+    return open_log_writer(file, columns, _COMMIT_LOG_TYPES, output_format, chunk_size=chunk_size, append=append)
+
+
+def _initialize_file_changes_csv(file, chunk_size=1000, append=False, output_format="csv"):
+    """
+    Creates an empty csv file with only the column names of the changed files of each commit
+    :param file: Name of the file that will be created
+    :param chunk_size: Number of rows that are buffered before they are written to the file
+    :param append: If True, the existing file is kept and the rows are appended to it
+    :param output_format: Format of the file, one of log_writer.OUTPUT_FORMATS
+    :return: Buffered writer to append the changed files to the file
+    """
+    return open_log_writer(file, _FILE_CHANGES_COLUMNS, _FILE_CHANGES_TYPES, output_format, chunk_size=chunk_size,
+                           append=append)
+
+
+def _initialize_issue_links_csv(file, chunk_size=1000, append=False, output_format="csv"):
+    """
+    Creates an empty csv file with only the column names of the links from commits to issues
+    :param file: Name of the file that will be created
+    :param chunk_size: Number of rows that are buffered before they are written to the file
+    :param append: If True, the existing file is kept and the rows are appended to it
+    :param output_format: Format of the file, one of log_writer.OUTPUT_FORMATS
+    :return: Buffered writer to append the links to the file
+    """
+    return open_log_writer(file, _ISSUE_LINKS_COLUMNS, _ISSUE_LINKS_TYPES, output_format, chunk_size=chunk_size,
+                           append=append)
+
+
+def _read_header(file):
+    """
+    Reads the column names of an existing csv file
+    :param file: Name of the csv file
+    :return: List of the column names, empty if the file is empty
+    """
+    with open(file, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+class _CommitLogWriter:
+    """
+    Writes the commit information of a collection into the commit log and the optional table of changed files
+    """
+
+    def __init__(self, files, chunk_size=1000, append=False, numstat=False, output_format="csv"):
+        """
+        Constructor
+        :param files: Dictionary with the file names of the outputs, "commits" for the commit log and optionally
+        "file_changes" for the table of changed files and "issue_links" for the table of referenced issues
+        :param chunk_size: Number of rows that are buffered before they are written to the files
+        :param append: If True, the rows are appended to the existing files
+        :param numstat: If True, the change statistics are added to the commit log
+        :param output_format: Format of the files, one of log_writer.OUTPUT_FORMATS
+        """
+        self.commits = _initialize_csv(files["commits"], chunk_size, append=append, numstat=numstat,
+                                       output_format=output_format)
+        self.file_changes = None
+        if files.get("file_changes") is not None:
+            self.file_changes = _initialize_file_changes_csv(files["file_changes"], chunk_size, append=append,
+                                                             output_format=output_format)
+        self.issue_links = None
+        if files.get("issue_links") is not None:
+            self.issue_links = _initialize_issue_links_csv(files["issue_links"], chunk_size, append=append,
+                                                           output_format=output_format)
+
+    def outputs(self):
+        """
+        Getter for the writers of all outputs
+        :return: Dictionary mapping the outputs of the files parameter to their writers
+        """
+        writers = {"commits": self.commits, "file_changes": self.file_changes, "issue_links": self.issue_links}
+        return {output: writer for output, writer in writers.items() if writer is not None}
+
+    def bytes_written(self):
+        """
+        Getter for the number of bytes that were written to all outputs so far
+        :return: Number of bytes
+        """
+        return sum(writer.bytes_written for writer in self.outputs().values())
+
+    def write(self, commit_info_dict):
+        """
+        Writes the information of a single commit into all outputs
+        :param commit_info_dict: Dictionary containing the commit information of the columns of the commit log
+        :return:
+        """
+        self.commits.write_row(commit_info_dict)
+        if self.file_changes is not None:
+            self.file_changes.write_rows(commit_info_dict["files"])
+        if self.issue_links is not None:
+            commit_hash = commit_info_dict["commit:hash"]
+            for issue_number in _find_issue_links(commit_info_dict["commit:message"]):
+                self.issue_links.write_row({"commit:hash": commit_hash, "issue:number": issue_number})
+
+    def close(self):
+        """
+        Writes the remaining buffered rows and closes all outputs
+        :return:
+        """
+        self.commits.close()
+        if self.file_changes is not None:
+            self.file_changes.close()
+        if self.issue_links is not None:
+            self.issue_links.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def _read_watermark(file, state_file):
+    """
+    Reads the hash of the newest commit that was collected into a commit log. It is taken from the state file if it
+    exists, otherwise from the row with the latest committer date. The first row is not necessarily the newest commit,
+    as incremental collections append the newer commits to the end of the log. Of several commits with the same date,
+    the first one is taken, which is the newest one of a single collection
+    :param file: Name of the csv file of the commit log
+    :param state_file: Name of the state file written by GitRepo.get_commit_information
+    :return: Hash of the newest collected commit or None if it is unknown
+    """
+    if os.path.exists(state_file):
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)["commit:hash"]
+    newest_hash, newest_date = None, None
+    with open(file, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return None
+        hash_column, date_column = header.index("commit:hash"), header.index("timestamp:committer:date")
+        for row in reader:
+            if newest_date is None or int(row[date_column]) > newest_date:
+                newest_hash, newest_date = row[hash_column], int(row[date_column])
+    return newest_hash
+
+
+def _write_watermark(state_file, commit_hash):
+    """
+    Stores the hash of the newest collected commit into the state file. The file is replaced atomically so that an
+    interrupted run never leaves a broken state file behind
+    :param state_file: Name of the state file
+    :param commit_hash: Hash of the newest collected commit
     :return:
     """
-    pd.DataFrame(columns=["commit:hash",
-                          "commit:message",
-                          "commit:author:name",
-                          "commit:author:mail",
-                          "commit:committer:name",
-                          "commit:committer:mail",
-                          "timestamp:author:date",
-                          "timestamp:author:timezone",
-                          "timestamp:committer:date",
-                          "timestamp:committer:timezone",
-                          "timestamp:committer",
-                          "timestamp:author",
-                          "commit:is_merge",
-                          "activity",
-                          "issue:number"]).to_csv(file, index=False)
-    return
-
-
-def _append_to_csv(df, file):
-    """
-    Appends the input DataFrame to the file initialized by initialize_csv
-    :param df: DataFrame containing commit information to store in the file (obtained by GitRepo.get_commit_information)
-    :param file: File name to store the information in (created by _initialize_csv)
+    temporary_file = state_file + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as f:
+        json.dump({"commit:hash": commit_hash}, f)
+    os.replace(temporary_file, state_file)
+
+
+class CollectionMetrics:
+    """
+    The class CollectionMetrics measures the progress and throughput of a commit collection. The time that is spent
+    waiting for the output of git is measured for the streaming collection only, the rest of the time is spent in
+    Python for parsing and writing.
+    """
+
+    def __init__(self, total_commits):
+        """
+        Constructor, starts the time measurement
+        :param total_commits: Number of commits that will be collected
+        """
+        self.total_commits = total_commits
+        self.commits = 0
+        self.bytes_written = 0
+        self.git_seconds = 0.0
+        # Sum of the durations of the worker processes of a parallel collection, git_seconds is summed up likewise
+        self.worker_seconds = 0.0
+        self.finished = False
+        self._time_start = time.perf_counter()
+
+    def summary(self):
+        """
+        Creates a machine-readable summary of the current state of the collection
+        :return: Dictionary containing the number of collected commits, the elapsed time, the commits per second, the
+        estimated remaining time, the written bytes and the time spent in git and in Python
+        """
+        elapsed_seconds = time.perf_counter() - self._time_start
+        commits_per_second = self.commits / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        eta_seconds = (self.total_commits - self.commits) / commits_per_second if commits_per_second > 0 else None
+        return {"commits": self.commits,
+                "total_commits": self.total_commits,
+                "elapsed_seconds": elapsed_seconds,
+                "commits_per_second": commits_per_second,
+                "eta_seconds": 0.0 if self.finished else eta_seconds,
+                "bytes_written": self.bytes_written,
+                "git_seconds": self.git_seconds,
+                "python_seconds": max(0.0, (self.worker_seconds or elapsed_seconds) - self.git_seconds),
+                "finished": self.finished}
+
+
+def _print_progress(metrics):
+    """
+    Default progress callback of GitRepo.get_commit_information that prints the progress
+    :param metrics: Summary of CollectionMetrics
     :return:
     """
-    df[["commit:hash",
-        "commit:message",
-        "commit:author:name",
-        "commit:author:mail",
-        "commit:committer:name",
-        "commit:committer:mail",
-        "timestamp:author:date",
-        "timestamp:author:timezone",
-        "timestamp:committer:date",
-        "timestamp:committer:timezone",
-        "timestamp:committer",
-        "timestamp:author",
-        "commit:is_merge",
-        "activity",
-        "issue:number"]].to_csv(file, mode='a', header=False, index=False)
-    return
+    if not metrics["finished"]:
+        print("Iteration: ", metrics["commits"], " of ", metrics["total_commits"])
+
+
+# Format of a single commit record of the streaming history read. Every record starts with a NUL byte (which cannot be
+# part of a commit message) and the fields are separated by the unit separator. The message is followed by a final
+# separator so that anything git appends to a record can be told apart from the message itself.
+_GIT_LOG_FIELDS = ["%H", "%P", "%an", "%ae", "%ad", "%cn", "%ce", "%cd", "%B"]
+_GIT_LOG_FORMAT = "%x00" + "%x1f".join(_GIT_LOG_FIELDS) + "%x1f"
+_GIT_LOG_READ_SIZE = 1 << 16
+
+_ISSUE_NUMBER_PATTERN = re.compile(r' #[0123456789]+ ')
+
+# Patterns of references to issues and pull requests in commit messages for the table of referenced issues
+_ISSUE_LINK_PATTERNS = [
+    # The reference " #N " of the issue:number column, but also finding references that directly follow each other
+    re.compile(r'(?<= )#([0-9]+)(?= )'),
+    # Closing keywords of GitHub, e.g. "Fixes #N", "closes: #N"
+    re.compile(r'\b(?:close[sd]?|fix(?:e[sd])?|resolve[sd]?):?\s*#([0-9]+)\b', re.IGNORECASE),
+    # Merge commits of pull requests
+    re.compile(r'^Merge pull request #([0-9]+)\b', re.MULTILINE),
+    # Titles of squashed pull requests, e.g. "Add feature (#N)"
+    re.compile(r'\(#([0-9]+)\)'),
+]
+
+
+def _find_issue_links(message):
+    """
+    Finds the numbers of all issues and pull requests that are referenced in a commit message
+    :param message: Commit message
+    :return: Sorted list of the distinct referenced issue numbers
+    """
+    return sorted(set(int(number) for pattern in _ISSUE_LINK_PATTERNS for number in pattern.findall(message)))
+
+
+def _utctz_to_altz(utctz):
+    """
+    Converts a git timezone string as "+0230" to the offset in seconds west of UTC as GitPython stores it in
+    Commit.author_tz_offset and Commit.committer_tz_offset
+    :param utctz: Timezone string of the git raw date format
+    :return: Offset in seconds west of UTC
+    """
+    seconds = int(utctz[1:3]) * 3600 + int(utctz[3:5]) * 60
+    return -seconds if utctz[0] != "-" else seconds
+
+
+def _iter_git_log(repo, *args, revisions=None, metrics=None):
+    """
+    Runs a single git log process on the repository and yields the raw commit records of its output while it is
+    still running, such that the whole history never has to be held in memory
+    :param repo: git.Repo object of the repository
+    :param args: Additional arguments for git log, e.g. the revision range
+    :param revisions: Optional list of commit hashes, if given exactly these commits are read in the given order
+    :param metrics: Optional CollectionMetrics that the time spent waiting for the output of git is added to
+    :return: Generator of the commit records as strings in the format of _GIT_LOG_FORMAT
+    """
+    # Paths of changed files are written as they are instead of as quoted escape sequences
+    git_command = repo.git(c="core.quotepath=off")
+    if revisions is None:
+        process = git_command.log("--date=raw", f"--format={_GIT_LOG_FORMAT}", *args, as_process=True)
+    else:
+        process = git_command.log("--date=raw", f"--format={_GIT_LOG_FORMAT}", "--no-walk=unsorted", "--stdin", *args,
+                                  as_process=True, istream=subprocess.PIPE)
+        # git log reads all revisions from stdin before it starts writing, so this can not block on the output pipe
+        process.stdin.write(("\n".join(revisions) + "\n").encode())
+        process.stdin.close()
+    buffer = b""
+    finished = False
+    try:
+        while True:
+            read_start = time.perf_counter()
+            chunk = process.stdout.read(_GIT_LOG_READ_SIZE)
+            if metrics is not None:
+                metrics.git_seconds += time.perf_counter() - read_start
+            if not chunk:
+                break
+            # NUL bytes never occur inside of UTF-8 encoded characters, so splitting the raw bytes is safe
+            records = (buffer + chunk).split(b"\x00")
+            buffer = records.pop()
+            for record in records:
+                if record:
+                    yield record.decode("utf-8", errors="replace")
+        if buffer:
+            yield buffer.decode("utf-8", errors="replace")
+        finished = True
+    finally:
+        if not finished:
+            # The caller stopped reading early, so git log must not be left blocking on a full pipe
+            process.proc.kill()
+        process.stdout.close()
+        if finished:
+            # Raises a git.GitCommandError if git log did not finish successfully
+            process.wait()
+
+
+def _parse_numstat(commit_hash, numstat):
+    """
+    Parses the --numstat output of git log for a single commit
+    :param commit_hash: Hash of the commit
+    :param numstat: Lines of the form "added\tdeleted\tpath" that follow the commit record
+    :return: List of dictionaries containing the columns of the table of changed files, the added and deleted lines
+    of binary files are None
+    """
+    files = []
+    for line in numstat.split("\n"):
+        if not line:
+            continue
+        lines_added, lines_deleted, path = line.split("\t", 2)
+        files.append({"commit:hash": commit_hash,
+                      "file:path": path,
+                      "file:lines_added": int(lines_added) if lines_added != "-" else None,
+                      "file:lines_deleted": int(lines_deleted) if lines_deleted != "-" else None})
+    return files
+
+
+def _parse_commit_record(record, numstat=False):
+    """
+    Parses a commit record of _iter_git_log into the commit information that is stored by
+    GitRepo.get_commit_information
+    :param record: Commit record in the format of _GIT_LOG_FORMAT
+    :param numstat: If True, the record is followed by the --numstat output of git log, which is parsed into the
+    change statistics and the list of changed files
+    :return: Dictionary containing the commit information of the columns of the commit log
+    """
+    commit_hash, parents, author_name, author_mail, author_date, committer_name, committer_mail, committer_date, \
+        rest = record.split("\x1f", len(_GIT_LOG_FIELDS) - 1)
+    message, _, trailer = rest.rpartition("\x1f")
+    authored_date, author_tz = author_date.split(" ")
+    committed_date, committer_tz = committer_date.split(" ")
+    author_tz_offset = _utctz_to_altz(author_tz)
+    committer_tz_offset = _utctz_to_altz(committer_tz)
+    authored_datetime = datetime.fromtimestamp(int(authored_date), timezone(timedelta(seconds=-author_tz_offset)))
+    committed_datetime = datetime.fromtimestamp(int(committed_date), timezone(timedelta(seconds=-committer_tz_offset)))
+    is_merge = len(parents.split(" ")) > 1
+    commit_info_dict = {"commit:hash": commit_hash,
+                        "commit:message": message,
+                        "commit:author:name": author_name,
+                        "commit:author:mail": author_mail,
+                        "commit:committer:name": committer_name,
+                        "commit:committer:mail": committer_mail,
+                        "timestamp:author:date": int(authored_date),
+                        "timestamp:author:timezone": author_tz_offset,
+                        "timestamp:committer:date": int(committed_date),
+                        "timestamp:committer:timezone": committer_tz_offset,
+                        # The two datetime columns are crossed over in the same way as in the GitPython based
+                        # collection to keep the logs of both collection modes identical
+                        "timestamp:committer": authored_datetime,
+                        "timestamp:author": committed_datetime,
+                        "commit:is_merge": is_merge,
+                        "activity": "merge committed" if is_merge else "committed",
+                        "issue:number": list(set([int(s.split("#")[1])
+                                                  for s in _ISSUE_NUMBER_PATTERN.findall(message)]))
+                        }
+    if numstat:
+        files = _parse_numstat(commit_hash, trailer)
+        commit_info_dict["files"] = files
+        commit_info_dict["commit:files_changed"] = len(files)
+        commit_info_dict["commit:lines_added"] = sum(f["file:lines_added"] or 0 for f in files)
+        commit_info_dict["commit:lines_deleted"] = sum(f["file:lines_deleted"] or 0 for f in files)
+    return commit_info_dict
+
+
+def _iter_commit_log(repo, *args, revisions=None, numstat=False, metrics=None):
+    """
+    Collects the commit information from a single streaming git log process
+    :param repo: git.Repo object of the repository
+    :param args: Additional arguments for git log, e.g. the revision range
+    :param revisions: Optional list of commit hashes, if given exactly these commits are collected in the given order
+    :param numstat: If True, the change statistics and changed files are read in the same pass
+    :param metrics: Optional CollectionMetrics that the time spent waiting for the output of git is added to
+    :return: Generator of dictionaries containing the commit information of the columns of the commit log
+    """
+    if numstat:
+        args = ("--numstat",) + args
+    for record in _iter_git_log(repo, *args, revisions=revisions, metrics=metrics):
+        yield _parse_commit_record(record, numstat=numstat)
+
+
+def _iter_commit_objects(repo, commits):
+    """
+    Collects the commit information with GitPython's commit objects, which needs several git processes per commit
+    :param repo: git.Repo object of the repository
+    :param commits: Iterable of the git.Commit objects that are collected
+    :return: Generator of dictionaries containing the commit information of the columns of the commit log
+    """
+    for commit in commits:
+        yield {"commit:hash": commit.hexsha,
+               "commit:message": commit.message,
+               "commit:author:name": commit.author,
+               "commit:author:mail": repo.git.show("-s", "--format=%ae", commit.hexsha),
+               "commit:committer:name": commit.committer,
+               "commit:committer:mail": repo.git.show("-s", "--format=%ce", commit.hexsha),
+               "timestamp:author:date": commit.authored_date,
+               "timestamp:author:timezone": commit.author_tz_offset,
+               "timestamp:committer:date": commit.committed_date,
+               "timestamp:committer:timezone": commit.committer_tz_offset,
+               "timestamp:committer": commit.authored_datetime,
+               "timestamp:author": commit.committed_datetime,
+               "commit:is_merge": True
+               if len((repo.git.show("-s", "--format=%P", commit.hexsha)).split(" ")) > 1
+               else False,
+               "activity": "merge committed"
+               if len((repo.git.show("-s", "--format=%P", commit.hexsha)).split(" ")) > 1
+               else "committed",
+               "issue:number": list(set([int(s.split("#")[1]) for s in re.findall(r' #[0123456789]+ ',
+                                                                                  commit.message)]))
+               }
 
 
 class GitRepo:
@@ -66,41 +506,273 @@ class GitRepo:
         """
         self.url = url
 
-    def get_commit_information(self, filename):
+    def get_commit_information(self, filename, streaming=True, chunk_size=1000, incremental=False, state_file=None,
+                               processes=1, numstat=False, file_changes_filename=None, issue_links_filename=None,
+                               output_format="csv", progress=None, progress_interval=100, metrics_filename=None):
         """
         Creates a commit log of the GitRepo and stores it into a csv file
         :param filename: name of the file to store the commit information in
-        :return:
+        :param streaming: If True, the whole history is read from a single git log process in one pass. Otherwise,
+        the commits are collected with GitPython's commit objects, which needs several git processes per commit
+        :param chunk_size: Number of commits that are buffered before they are written to the file
+        :param incremental: If True and the file already exists, only the commits that are newer than the newest
+        collected commit are collected and appended to the end of the file. Falls back to a complete collection if
+        the newest collected commit is not part of the current history anymore
+        :param state_file: Name of the file storing the newest collected commit for incremental collections, defaults
+        to the name of the commit log with the suffix .state.json. Collections that write the log from scratch delete
+        it, incremental collections store it once they finished
+        :param processes: Number of processes that collect contiguous parts of the history in parallel. The parts
+        are merged in order, so the log is the same as the one of a single process
+        :param numstat: If True, the number of changed files and the added and deleted lines of each commit are added
+        as columns to the commit log. Merge commits have no change statistics. Requires streaming
+        :param file_changes_filename: Optional name of a csv file to store one row for each file that was changed by
+        a commit in. Renamed files are given as "old => new" in the same way as git prints them. Requires streaming
+        :param issue_links_filename: Optional name of a csv file to store one row for each issue or pull request that
+        is referenced by a commit in. Besides " #N ", the references "Fixes #N" (and the other closing keywords of
+        GitHub), "Merge pull request #N" and "(#N)" are found
+        :param output_format: Format of all written files, either "csv" or one of the typed formats "parquet" and
+        "feather". The typed formats store datetimes as int64 seconds since epoch, timezone offsets as integers and
+        booleans and issue number lists typed. They need pyarrow and can not be used for incremental collections
+        :param progress: Optional callable that is called with the summary of CollectionMetrics every
+        progress_interval commits and once at the end. If not given, the progress is printed
+        :param progress_interval: Number of commits between two calls of progress, for parallel collections it is
+        called after each finished part instead
+        :param metrics_filename: Optional name of a json file to store the summary of the collection in
+        :return: Summary of the collection, containing the commits per second, the written bytes and the time spent in
+        git and in Python, see CollectionMetrics.summary
         """
+        if not streaming and (numstat or file_changes_filename is not None):
+            raise ValueError("Change statistics can only be collected with streaming=True")
+        if incremental and output_format != "csv":
+            raise ValueError("Incremental collections can only append to csv files")
         repo = git.Repo(self.url)
-        _initialize_csv(filename)
         time_start = datetime.now()
-        iteration = 1
-        max_iteration = len(list(repo.iter_commits()))
-        for commit in repo.iter_commits():
-            if iteration % 100 == 0:
-                print("Iteration: ", iteration, " of ", max_iteration)
-            commit_info_dict = {"commit:hash": commit.hexsha,
-                                "commit:message": commit.message,
-                                "commit:author:name": commit.author,
-                                "commit:author:mail": repo.git.show("-s", "--format=%ae", commit.hexsha),
-                                "commit:committer:name": commit.committer,
-                                "commit:committer:mail": repo.git.show("-s", "--format=%ce", commit.hexsha),
-                                "timestamp:author:date": commit.authored_date,
-                                "timestamp:author:timezone": commit.author_tz_offset,
-                                "timestamp:committer:date": commit.committed_date,
-                                "timestamp:committer:timezone": commit.committer_tz_offset,
-                                "timestamp:committer": commit.authored_datetime,
-                                "timestamp:author": commit.committed_datetime,
-                                "commit:is_merge": True
-                                if len((repo.git.show("-s", "--format=%P", commit.hexsha)).split(" ")) > 1
-                                else False,
-                                "activity": "merge committed"
-                                if len((repo.git.show("-s", "--format=%P", commit.hexsha)).split(" ")) > 1
-                                else "committed",
-                                "issue:number": list(set([int(s.split("#")[1]) for s in re.findall(r' #[0123456789]+ ',
-                                                                                                   commit.message)]))
-                                }
-            _append_to_csv(pd.DataFrame([commit_info_dict]), filename)
-            iteration += 1
+        files = {"commits": filename, "file_changes": file_changes_filename, "issue_links": issue_links_filename}
+        head = repo.git.rev_parse("HEAD")
+        rev = head
+        append = False
+        if state_file is None:
+            state_file = filename + ".state.json"
+        if incremental:
+            last_hash = _read_watermark(filename, state_file) if os.path.exists(filename) else None
+            if last_hash is not None:
+                expected_columns = _COMMIT_LOG_COLUMNS + _NUMSTAT_COLUMNS if numstat else _COMMIT_LOG_COLUMNS
+                if _read_header(filename) != expected_columns:
+                    raise ValueError(f"The columns of {filename} do not match the requested columns, collect it "
+                                     f"again without incremental")
+                try:
+                    if repo.is_ancestor(last_hash, head):
+                        rev = f"{last_hash}..{head}"
+                        append = True
+                    else:
+                        print("Last collected commit ", last_hash, " is not part of the history, collecting all "
+                                                                   "commits")
+                except git.GitCommandError:
+                    print("Last collected commit ", last_hash, " does not exist, collecting all commits")
+        max_iteration = int(repo.git.rev_list("--count", rev))
+        if append:
+            print("Collecting ", max_iteration, " new commits since ", rev.split("..")[0])
+            if file_changes_filename is not None and not os.path.exists(file_changes_filename):
+                _initialize_file_changes_csv(file_changes_filename).close()
+            if issue_links_filename is not None and not os.path.exists(issue_links_filename):
+                _initialize_issue_links_csv(issue_links_filename).close()
+        read_numstat = numstat or file_changes_filename is not None
+        metrics = CollectionMetrics(max_iteration)
+        if progress is None:
+            progress = _print_progress
+        if not append and os.path.exists(state_file):
+            # The log is written from scratch, so the watermark of the previous log does not belong to it anymore
+            os.remove(state_file)
+        # The watermark is only stored once all new commits are appended, so the rows that an interrupted run appended
+        # are removed again, otherwise the next run would append them a second time
+        sizes = {file: os.path.getsize(file) for file in files.values() if file is not None} if append else {}
+        try:
+            if processes > 1:
+                _collect_commits_in_parallel(repo, rev, files, append, streaming, chunk_size, processes, numstat,
+                                             read_numstat, output_format, metrics, progress)
+            else:
+                if streaming:
+                    commits = _iter_commit_log(repo, rev, numstat=read_numstat, metrics=metrics)
+                else:
+                    commits = _iter_commit_objects(repo, repo.iter_commits(rev))
+                with _CommitLogWriter(files, chunk_size, append=append, numstat=numstat,
+                                      output_format=output_format) as writer:
+                    for iteration, commit_info_dict in enumerate(commits, start=1):
+                        writer.write(commit_info_dict)
+                        metrics.commits = iteration
+                        if iteration % progress_interval == 0:
+                            metrics.bytes_written = writer.bytes_written()
+                            progress(metrics.summary())
+                metrics.bytes_written = writer.bytes_written()
+        except BaseException:
+            for file, size in sizes.items():
+                os.truncate(file, size)
+            raise
+        if incremental:
+            _write_watermark(state_file, head)
+        metrics.finished = True
+        summary = metrics.summary()
+        progress(summary)
+        if metrics_filename is not None:
+            with open(metrics_filename, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
         print("Finished Commit Information Collection in: ", datetime.now() - time_start)
+        return summary
+
+
+def _collect_commit_shard(url, hashes, shard_files, streaming, chunk_size, numstat, read_numstat, output_format):
+    """
+    Collects the commit information of a contiguous part of the history into files without header, runs in a
+    worker process of _collect_commits_in_parallel
+    :param url: Path to the local Git repository
+    :param hashes: List of the commit hashes of this part in the order of the commit log
+    :param shard_files: Dictionary with the names of the files to store the outputs of this part in
+    :param streaming: Whether the commits are read from a git log process or with GitPython's commit objects
+    :param chunk_size: Number of commits that are buffered before they are written to the files
+    :param numstat: Whether the change statistics are added to the commit log
+    :param read_numstat: Whether the change statistics are read from git log
+    :param output_format: Format of the files, one of log_writer.OUTPUT_FORMATS
+    :return: Summary of the CollectionMetrics of this part
+    """
+    repo = git.Repo(url)
+    metrics = CollectionMetrics(len(hashes))
+    if streaming:
+        commits = _iter_commit_log(repo, revisions=hashes, numstat=read_numstat, metrics=metrics)
+    else:
+        commits = _iter_commit_objects(repo, (repo.commit(commit_hash) for commit_hash in hashes))
+    # Parts of csv files are written without header, typed files can not be appended to and get their own schema
+    with _CommitLogWriter(shard_files, chunk_size, append=output_format == "csv", numstat=numstat,
+                          output_format=output_format) as writer:
+        for commit_info_dict in commits:
+            writer.write(commit_info_dict)
+            metrics.commits += 1
+    metrics.finished = True
+    return metrics.summary()
+
+
+def _collect_commits_in_parallel(repo, rev, files, append, streaming, chunk_size, processes, numstat, read_numstat,
+                                 output_format, metrics, progress):
+    """
+    Splits the commit list of the revision range into contiguous parts, collects them in a process pool and merges
+    the parts in their original order into the outputs
+    :param repo: git.Repo object of the repository
+    :param rev: Revision range of the commits that are collected
+    :param files: Dictionary with the file names of the outputs, see _CommitLogWriter
+    :param append: If True, the commits are appended to the existing files
+    :param streaming: Whether the commits are read from a git log process or with GitPython's commit objects
+    :param chunk_size: Number of commits that are buffered before they are written to the files
+    :param processes: Number of worker processes
+    :param numstat: Whether the change statistics are added to the commit log
+    :param read_numstat: Whether the change statistics are read from git log
+    :param output_format: Format of the files, one of log_writer.OUTPUT_FORMATS
+    :param metrics: CollectionMetrics that the metrics of the parts are added to
+    :param progress: Callable that is called with the summary of metrics after each finished part
+    :return:
+    """
+    hashes = repo.git.rev_list(rev).split()
+    # More parts than processes, so that a process that finished early can take over another part
+    shard_count = max(1, min(processes * 4, len(hashes)))
+    shard_size = -(-len(hashes) // shard_count) if hashes else 0
+    shards = [hashes[i:i + shard_size] for i in range(0, len(hashes), shard_size)] if hashes else []
+    outputs = [output for output, file in files.items() if file is not None]
+    shard_directory = tempfile.mkdtemp(prefix="commit_shards_", dir=os.path.dirname(os.path.abspath(files["commits"])))
+    try:
+        shard_files = [{output: os.path.join(shard_directory, f"shard_{i}_{output}.{output_format}")
+                        for output in outputs}
+                       for i in range(len(shards))]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_collect_commit_shard, repo.working_dir, shard, shard_file, streaming,
+                                       chunk_size, numstat, read_numstat, output_format)
+                       for shard, shard_file in zip(shards, shard_files)]
+            for iteration, future in enumerate(futures, start=1):
+                shard_metrics = future.result()
+                metrics.commits += shard_metrics["commits"]
+                metrics.git_seconds += shard_metrics["git_seconds"]
+                metrics.worker_seconds += shard_metrics["elapsed_seconds"]
+                print("Finished part ", iteration, " of ", len(futures), " with ", shard_metrics["commits"], " commits")
+                progress(metrics.summary())
+        # Opening the writers creates the files with their headers or keeps the existing files when appending
+        with _CommitLogWriter(files, chunk_size, append=append, numstat=numstat,
+                              output_format=output_format) as writer:
+            for output, output_writer in writer.outputs().items():
+                for shard_file in shard_files:
+                    output_writer.write_file(shard_file[output])
+        metrics.bytes_written = writer.bytes_written()
+    finally:
+        shutil.rmtree(shard_directory, ignore_errors=True)
+
+
+# Parameters of GitRepo.get_commit_information that name a file of a single repository
+_PER_REPOSITORY_FILE_PARAMETERS = ["state_file", "file_changes_filename", "issue_links_filename", "metrics_filename"]
+
+
+def collect_commit_logs(urls, saving_directory="", max_workers=4, file_changes=False, issue_links=False,
+                        metrics=False, **kwargs):
+    """
+    Creates the commit logs of multiple local Git repositories in a pool of worker processes. Each repository is
+    stored into its own file {saving_directory}/{repository directory name}_commits.{output_format}, the optional
+    outputs are stored next to it with the suffixes _file_changes, _issue_links and _metrics. A repository that can
+    not be collected is reported and does not abort the collection of the other repositories
+    :param urls: List of paths to the local Git repositories
+    :param saving_directory: Directory to save the commit logs in
+    :param max_workers: Maximum number of repositories that are collected at the same time
+    :param file_changes: If True, the changed files of each repository are stored, see file_changes_filename of
+    GitRepo.get_commit_information
+    :param issue_links: If True, the links from the commits to issues of each repository are stored, see
+    issue_links_filename of GitRepo.get_commit_information
+    :param metrics: If True, the summary of the collection of each repository is stored as json file
+    :param kwargs: Further parameters that are passed to GitRepo.get_commit_information of each repository. The file
+    names of a single repository can not be passed, as they would be shared by all repositories
+    :return: List of dictionaries containing the path, the file, the status, the error message, the duration and the
+    metrics summary of the collection of each repository in the order of urls
+    """
+    shared_files = [parameter for parameter in _PER_REPOSITORY_FILE_PARAMETERS if parameter in kwargs]
+    if shared_files:
+        raise ValueError(f"The parameters {shared_files} name the file of a single repository, they are derived from "
+                         f"the repository directory names instead")
+    extension = kwargs.get("output_format", "csv")
+    names = [saving_directory + f"/{os.path.basename(os.path.normpath(url))}" for url in urls]
+    if len(set(names)) != len(names):
+        raise ValueError("The repository directories must have distinct names to get one file per repository")
+    filenames = [f"{name}_commits.{extension}" for name in names]
+    repository_kwargs = [dict(kwargs,
+                              file_changes_filename=f"{name}_file_changes.{extension}" if file_changes else None,
+                              issue_links_filename=f"{name}_issue_links.{extension}" if issue_links else None,
+                              metrics_filename=f"{name}_metrics.json" if metrics else None)
+                         for name in names]
+    results = [{"repository": url, "file": filename, "status": "pending", "error": None, "duration": None,
+                 "metrics": None}
+               for url, filename in zip(urls, filenames)]
+    time_start = datetime.now()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_collect_repository, url, filename, repository_kwargs[index]): index
+                   for index, (url, filename) in enumerate(zip(urls, filenames))}
+        for iteration, future in enumerate(as_completed(futures), start=1):
+            result = results[futures[future]]
+            try:
+                result["duration"], result["metrics"] = future.result()
+                result["status"] = "finished"
+                print("Finished repository ", iteration, " of ", len(urls), ": ", result["repository"], " in ",
+                      result["duration"])
+            except Exception as e:
+                result["status"] = "failed"
+                result["error"] = repr(e)
+                print("Failed repository ", iteration, " of ", len(urls), ": ", result["repository"], " - ",
+                      result["error"])
+    failed = len([result for result in results if result["status"] == "failed"])
+    print("Finished collection of ", len(urls), " repositories with ", failed, " failures in: ",
+          datetime.now() - time_start)
+    return results
+
+
+def _collect_repository(url, filename, kwargs):
+    """
+    Creates the commit log of a single repository, runs in a worker process of collect_commit_logs
+    :param url: Path to the local Git repository
+    :param filename: Name of the file to store the commit information in
+    :param kwargs: Further parameters of GitRepo.get_commit_information
+    :return: Duration and metrics summary of the collection
+    """
+    time_start = datetime.now()
+    metrics = GitRepo(url).get_commit_information(filename, **kwargs)
+    return datetime.now() - time_start, metrics
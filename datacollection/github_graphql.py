@@ -0,0 +1,299 @@
+import json
+import re
+from collections import deque
+
+# To get insight into the used fields, take a look into GitHub's GraphQL API documentation
+# https://docs.github.com/en/graphql
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# Connections of an issue or pull request that can be collected
+GRAPHQL_CONNECTIONS = ["comments", "reviews", "review_comments", "events"]
+
+# Maximum number of items of a connection per page of the GraphQL API
+_PAGE_SIZE = 100
+
+# Timeline items that are returned by the /issues/{issue_number}/events end point of the REST API
+_EVENT_TYPES = ["AddedToProjectEvent", "AssignedEvent", "AutomaticBaseChangeFailedEvent",
+                "AutomaticBaseChangeSucceededEvent", "BaseRefChangedEvent", "BaseRefDeletedEvent",
+                "BaseRefForcePushedEvent", "ClosedEvent", "CommentDeletedEvent", "ConnectedEvent",
+                "ConvertToDraftEvent", "ConvertedNoteToIssueEvent", "DemilestonedEvent", "DeployedEvent",
+                "DeploymentEnvironmentChangedEvent", "DisconnectedEvent", "HeadRefDeletedEvent",
+                "HeadRefForcePushedEvent", "HeadRefRestoredEvent", "LabeledEvent", "LockedEvent",
+                "MarkedAsDuplicateEvent", "MentionedEvent", "MergedEvent", "MilestonedEvent",
+                "MovedColumnsInProjectEvent", "PinnedEvent", "ReadyForReviewEvent", "ReferencedEvent",
+                "RemovedFromProjectEvent", "RenamedTitleEvent", "ReopenedEvent", "ReviewDismissedEvent",
+                "ReviewRequestRemovedEvent", "ReviewRequestedEvent", "SubscribedEvent", "TransferredEvent",
+                "UnassignedEvent", "UnlabeledEvent", "UnlockedEvent", "UnmarkedAsDuplicateEvent", "UnpinnedEvent",
+                "UnsubscribedEvent", "UserBlockedEvent"]
+
+# Events of the list above that only pull requests have, they are not members of the IssueTimelineItems union and
+# not values of IssueTimelineItemsItemType, so they must not be requested from the timeline of an issue
+_PULL_REQUEST_EVENT_TYPES = ["AutomaticBaseChangeFailedEvent", "AutomaticBaseChangeSucceededEvent",
+                             "BaseRefChangedEvent", "BaseRefDeletedEvent", "BaseRefForcePushedEvent",
+                             "ConvertToDraftEvent", "DeployedEvent", "DeploymentEnvironmentChangedEvent",
+                             "HeadRefDeletedEvent", "HeadRefForcePushedEvent", "HeadRefRestoredEvent", "MergedEvent",
+                             "ReadyForReviewEvent", "ReviewDismissedEvent", "ReviewRequestRemovedEvent",
+                             "ReviewRequestedEvent"]
+
+# Events that are requested from the timeline of each type
+_TIMELINE_EVENT_TYPES = {"Issue": [event_type for event_type in _EVENT_TYPES
+                                   if event_type not in _PULL_REQUEST_EVENT_TYPES],
+                         "PullRequest": _EVENT_TYPES}
+
+# Names of the REST API for the events whose name is not derived from the GraphQL type, see _event_name
+_EVENT_NAMES = {"RenamedTitleEvent": "renamed"}
+
+_ACTOR_FIELDS = "login ... on User { databaseId } ... on Bot { databaseId } ... on Mannequin { databaseId } " \
+                "... on Organization { databaseId }"
+_COMMENT_FIELDS = f"url createdAt body authorAssociation author {{ {_ACTOR_FIELDS} }}"
+_REVIEW_FIELDS = f"submittedAt body authorAssociation commit {{ oid }} author {{ {_ACTOR_FIELDS} }}"
+_REVIEW_COMMENT_FIELDS = f"createdAt body authorAssociation commit {{ oid }} author {{ {_ACTOR_FIELDS} }}"
+_USER_FIELDS = "login databaseId name email company location"
+# Fields of the events besides the actor and time, MergedEvent is only spread on the timeline of pull requests
+_EVENT_COMMIT_FIELDS = {"ReferencedEvent": "commit { oid }", "MergedEvent": "commit { oid }",
+                        "ClosedEvent": "closer { ... on Commit { oid } }"}
+
+
+def collect_connection(send, owner, repo, numbers, connection, batch_size=25):
+    """
+    Collects a connection of issues or pull requests with batched GraphQL queries. Each query requests a page of
+    the connection for up to batch_size issues at once, the following pages are requested with the cursors of the
+    previous pages until all items are collected. The items are returned in the format of the REST API, so that they
+    can be formatted into log rows by the same functions
+    :param send: Function that sends a GraphQL query and returns the data of the response
+    :param owner: Owner name of the repo
+    :param repo: Name of the repo
+    :param numbers: List of the numbers of the issues or pull requests
+    :param connection: One of GRAPHQL_CONNECTIONS
+    :param batch_size: Maximum number of pages that are requested by a single query
+    :return: Dictionary mapping each number to the list of its items in the order of the API
+    """
+    if connection not in GRAPHQL_CONNECTIONS:
+        raise ValueError(f"Unknown connection {connection}, expected one of {GRAPHQL_CONNECTIONS}")
+    items = {number: [] for number in numbers}
+    # A task is the next page of the connection of an issue, or of the comments of a review with more than a page
+    tasks = deque(("issue", number, None) for number in numbers)
+    while tasks:
+        batch = [tasks.popleft() for _ in range(min(batch_size, len(tasks)))]
+        data = send(_build_query(owner, repo, batch, connection))
+        for index, task in enumerate(batch):
+            if task[0] == "issue":
+                result = (data.get("repository") or {}).get(f"t{index}")
+            else:
+                result = data.get(f"t{index}")
+            # Issues that were deleted or transferred and connections of the other issue type are returned as null
+            page = (result or {}).get("connection")
+            if page is None:
+                continue
+            number = task[1]
+            if task[0] == "review":
+                items[number].extend(_rest_review_comment(node, owner, repo, number) for node in page["nodes"])
+            elif connection == "review_comments":
+                for review in page["nodes"]:
+                    comments = review["comments"]
+                    items[number].extend(_rest_review_comment(node, owner, repo, number)
+                                         for node in comments["nodes"])
+                    if comments["pageInfo"]["hasNextPage"]:
+                        tasks.append(("review", number, review["id"], comments["pageInfo"]["endCursor"]))
+            else:
+                items[number].extend(_to_rest(connection, node, owner, repo, number) for node in page["nodes"])
+            if page["pageInfo"]["hasNextPage"]:
+                tasks.append(task[:-1] + (page["pageInfo"]["endCursor"],))
+    return items
+
+
+def collect_users(send, logins):
+    """
+    Collects the profiles of users with a single GraphQL query
+    :param send: Function that sends a GraphQL query and returns the data of the response
+    :param logins: List of the login names of the users
+    :return: Dictionary mapping each login name to the profile in the format of the REST API /users/{username} end
+    point, or None if the user was not found
+    """
+    query = "query { " + " ".join(f"u{index}: user(login: {json.dumps(login)}) {{ {_USER_FIELDS} }}"
+                                  for index, login in enumerate(logins)) + " }"
+    data = send(query)
+    return {login: _rest_profile(data.get(f"u{index}")) for index, login in enumerate(logins)}
+
+
+def _build_query(owner, repo, tasks, connection):
+    """
+    Builds a GraphQL query that requests a page for each task, every page gets the alias t{index of the task}
+    :param owner: Owner name of the repo
+    :param repo: Name of the repo
+    :param tasks: List of tuples ("issue", number, cursor) and ("review", number, review id, cursor)
+    :param connection: One of GRAPHQL_CONNECTIONS
+    :return: String containing the query
+    """
+    issue_pages = []
+    review_pages = []
+    for index, task in enumerate(tasks):
+        if task[0] == "issue":
+            types = ["PullRequest"] if connection in ("reviews", "review_comments") else ["Issue", "PullRequest"]
+            fragments = " ".join(f"... on {issue_type} {{ {_issue_connection_field(connection, task[2], issue_type)} }}"
+                                 for issue_type in types)
+            issue_pages.append(f"t{index}: issueOrPullRequest(number: {task[1]}) {{ {fragments} }}")
+        else:
+            field = _page_field("connection: comments", task[3], _REVIEW_COMMENT_FIELDS)
+            review_pages.append(f"t{index}: node(id: {json.dumps(task[2])}) "
+                                f"{{ ... on PullRequestReview {{ {field} }} }}")
+    query = "query {"
+    if issue_pages:
+        query += f" repository(owner: {json.dumps(owner)}, name: {json.dumps(repo)}) {{ {' '.join(issue_pages)} }}"
+    return query + "".join(" " + page for page in review_pages) + " }"
+
+
+def _issue_connection_field(connection, cursor, issue_type):
+    """
+    Selection of a page of a connection of an issue or pull request, aliased as connection
+    :param connection: One of GRAPHQL_CONNECTIONS
+    :param cursor: Cursor of the previous page or None for the first page
+    :param issue_type: GraphQL type of the selected node, either Issue or PullRequest
+    :return: String containing the selection
+    """
+    if connection == "comments":
+        return _page_field("connection: comments", cursor, _COMMENT_FIELDS)
+    if connection == "reviews":
+        return _page_field("connection: reviews", cursor, _REVIEW_FIELDS)
+    if connection == "review_comments":
+        # The review comments are requested as the first page of the comments of each review
+        return _page_field("connection: reviews", cursor,
+                           "id " + _page_field("comments", None, _REVIEW_COMMENT_FIELDS))
+    event_types = _TIMELINE_EVENT_TYPES[issue_type]
+    item_types = ", ".join(re.sub(r"(?<!^)(?=[A-Z])", "_", event_type).upper() for event_type in event_types)
+    return _page_field("connection: timelineItems", cursor, _event_fields(event_types), f"itemTypes: [{item_types}]")
+
+
+def _event_fields(event_types):
+    """
+    Selection of the fields of the timeline items, with a fragment for each of the event types
+    :param event_types: List of the GraphQL types of the events, all of them members of the union of the timeline
+    :return: String containing the selection
+    """
+    fields = "__typename " + " ".join(f"... on {event_type} {{ createdAt actor {{ {_ACTOR_FIELDS} }} }}"
+                                      for event_type in event_types)
+    return fields + "".join(f" ... on {event_type} {{ {commit_fields} }}"
+                            for event_type, commit_fields in _EVENT_COMMIT_FIELDS.items() if event_type in event_types)
+
+
+def _page_field(field, cursor, node_fields, arguments=None):
+    """
+    Selection of a page of a connection with its page info
+    :param field: Name of the connection field, optionally with an alias
+    :param cursor: Cursor of the previous page or None for the first page
+    :param node_fields: Selection of the fields of the items
+    :param arguments: Optional further arguments of the connection field
+    :return: String containing the selection
+    """
+    field_arguments = [f"first: {_PAGE_SIZE}"]
+    if cursor is not None:
+        field_arguments.append(f"after: {json.dumps(cursor)}")
+    if arguments is not None:
+        field_arguments.append(arguments)
+    return f"{field}({', '.join(field_arguments)}) {{ pageInfo {{ hasNextPage endCursor }} nodes {{ {node_fields} }} }}"
+
+
+def _to_rest(connection, node, owner, repo, number):
+    """
+    Converts an item of a connection into the format of the REST API
+    :param connection: One of GRAPHQL_CONNECTIONS except review_comments
+    :param node: Dictionary of the item
+    :param owner: Owner name of the repo
+    :param repo: Name of the repo
+    :param number: Number of the issue or pull request
+    :return: Dictionary in the format of the REST API
+    """
+    if connection == "comments":
+        return _rest_issue_comment(node)
+    if connection == "reviews":
+        return _rest_review(node, owner, repo, number)
+    return _rest_event(node)
+
+
+def _rest_user(actor):
+    """
+    Converts an actor into a user of the REST API
+    :param actor: Dictionary of the actor or None for deleted accounts
+    :return: Dictionary with the login and id of the user or None
+    """
+    if actor is None:
+        return None
+    return {"login": actor["login"], "id": actor.get("databaseId")}
+
+
+def _rest_profile(node):
+    """
+    Converts a User into a profile of the /users/{username} end point
+    :param node: Dictionary of the user or None if the user was not found
+    :return: Dictionary in the format of the REST API or None
+    """
+    if node is None:
+        return None
+    # Mail addresses that are not public are returned as empty string instead of null
+    return {"login": node["login"], "id": node["databaseId"], "name": node["name"], "email": node["email"] or None,
+            "company": node["company"], "location": node["location"]}
+
+
+def _rest_issue_comment(node):
+    """
+    Converts an IssueComment into a comment of the /issues/{issue_number}/comments end point
+    :param node: Dictionary of the comment
+    :return: Dictionary in the format of the REST API
+    """
+    return {"html_url": node["url"], "created_at": node["createdAt"], "user": _rest_user(node["author"]),
+            "author_association": node["authorAssociation"], "body": node["body"]}
+
+
+def _rest_review(node, owner, repo, number):
+    """
+    Converts a PullRequestReview into a review of the /pulls/{pull_number}/reviews end point
+    :param node: Dictionary of the review
+    :param owner: Owner name of the repo
+    :param repo: Name of the repo
+    :param number: Number of the pull request
+    :return: Dictionary in the format of the REST API
+    """
+    review = {"pull_request_url": f"https://api.github.com/repos/{owner}/{repo}/pulls/{number}",
+              "submitted_at": node["submittedAt"], "user": _rest_user(node["author"]),
+              "author_association": node["authorAssociation"], "body": node["body"]}
+    if node.get("commit") is not None:
+        review["commit_id"] = node["commit"]["oid"]
+    return review
+
+
+def _rest_review_comment(node, owner, repo, number):
+    """
+    Converts a PullRequestReviewComment into a comment of the /pulls/comments end point
+    :param node: Dictionary of the review comment
+    :param owner: Owner name of the repo
+    :param repo: Name of the repo
+    :param number: Number of the pull request
+    :return: Dictionary in the format of the REST API
+    """
+    return {"pull_request_url": f"https://api.github.com/repos/{owner}/{repo}/pulls/{number}",
+            "created_at": node["createdAt"], "user": _rest_user(node["author"]),
+            "author_association": node["authorAssociation"], "body": node["body"],
+            "commit_id": node["commit"]["oid"] if node.get("commit") is not None else None}
+
+
+def _rest_event(node):
+    """
+    Converts a timeline item into an event of the /issues/{issue_number}/events end point
+    :param node: Dictionary of the timeline item
+    :return: Dictionary in the format of the REST API
+    """
+    commit = node.get("commit") or node.get("closer") or {}
+    return {"event": _event_name(node["__typename"]), "created_at": node.get("createdAt"),
+            "actor": _rest_user(node.get("actor")), "commit_id": commit.get("oid")}
+
+
+def _event_name(type_name):
+    """
+    Name of an event in the REST API, e.g. head_ref_deleted for the GraphQL type HeadRefDeletedEvent
+    :param type_name: GraphQL type of the timeline item
+    :return: String containing the name of the event
+    """
+    if type_name in _EVENT_NAMES:
+        return _EVENT_NAMES[type_name]
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", type_name[:-len("Event")]).lower()
@@ -1,10 +1,35 @@
+import csv
+import json
+import os
+import re
+import tempfile
 import time
-from datetime import datetime
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from enum import Enum
+from itertools import islice
 from json.decoder import JSONDecodeError
+from urllib.parse import parse_qs, urlparse
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from datacollection.checkpoint import Checkpoint, phase_start
+from datacollection.github_graphql import GRAPHQL_URL, collect_connection, collect_users
+from datacollection.identity_resolution import IdentityResolver
+from datacollection.log_writer import BufferedCSVWriter
+from datacollection.pipeline import run_pipeline
+from datacollection.rate_limit import TokenScheduler
+from datacollection.response_archive import ResponseArchive
+from datacollection.response_cache import ResponseCache
+from datacollection.retry import RetryPolicy
+from datacollection.user_cache import UserCache
 
 
 # To get insight into the used fields of the responses, take a look into GitHub's API documentation
@@ -17,28 +42,122 @@ class GitHubRepo:
     The class GitHubRepo saves the authtoken that is used to access the API, the owner and the name of the repository
     Its attributes issues and pullrequests will store general information on the issues and pull requests once the
     method __get_issues_and_prs is called.
+    If its attribute since is set to an ISO 8601 timestamp, only the issues and pull requests that were updated since
+    then are collected, and their rows replace the rows of the same issues in existing logs (see build_logs).
     """
 
-    def __init__(self, authtoken, owner, repo):
+    def __init__(self, authtoken, owner, repo, chunk_size=1000, pool_size=10, concurrency=1, cache_file=None,
+                 strategy="per_issue", timeline=False, rate_limit_reserve=10, checkpoint_file=None, max_retries=10,
+                 retry_budget=None, archive_directory=None, replay=False, spill_directory=None, backend="rest",
+                 graphql_url=GRAPHQL_URL, graphql_batch_size=25, user_cache_file=None, format_workers=1):
         """
         Constructor
-        :param authtoken: String containing the authtoken for GitHub API access
+        :param authtoken: String containing the authtoken for GitHub API access, or a list of authtokens that the
+        requests are distributed over
         :param owner: String containing the owner name of the repo
         :param repo: String containing the name of the repo
+        :param chunk_size: Number of log rows that are buffered before they are written to the csv files
+        :param pool_size: Maximum number of connections to the API that are kept open for reuse
+        :param concurrency: Number of issues whose comments, events and reviews are collected at the same time, and
+        number of pages of the issue list and the repository wide end points that are requested at the same time once
+        the last page is known. With 1, the issues and pages are collected one after another
+        :param cache_file: Optional name of a sqlite file to cache the responses in. Requests of cached responses are
+        sent as conditional requests, and the cached body is used if GitHub answers with 304 Not Modified
+        :param strategy: Either "per_issue" to request the comments and events of each issue and pull request on its
+        own, or "repository" to page through the comments and events of the whole repository and map them to the
+        issues, which needs far fewer requests if most issues have little activity
+        :param timeline: If True, build_pull_request_log collects the comments, reviews, review comments and events of
+        each pull request from its timeline, a single stream instead of three end points, see get_pull_request_timeline
+        :param rate_limit_reserve: Number of requests per authtoken that are left unused before waiting for the reset
+        of the rate limit, see rate_limit.TokenScheduler
+        :param checkpoint_file: Optional name of a json file to store the progress of the collection in. If it exists,
+        a previous collection that crashed is resumed where it stopped. It is deleted once build_logs finished
+        :param max_retries: Number of times a request is sent again after a server error, a secondary rate limit or a
+        connection error, with exponentially growing delays, see retry.RetryPolicy
+        :param retry_budget: Number of retries of all requests together before the collection fails, None for no limit
+        :param archive_directory: Optional directory of a compressed archive that the raw body of every response is
+        stored in, see response_archive.ResponseArchive
+        :param replay: If True, the responses are read from the archive_directory instead of the API, so the logs are
+        built again without any request. The archive has to be collected with the same strategy and timeline setting,
+        and incremental collections are not replayed
+        :param spill_directory: Optional directory to keep the issues and pull requests of the repository in temporary
+        files instead of the memory, for repositories with a very large number of issues
+        :param backend: Either "rest" to collect the comments, reviews, review comments and events from the end points
+        of the REST API, or "graphql" to collect them for many issues per query from the GraphQL API, see
+        github_graphql.collect_connection. The issue list is always collected from the REST API
+        :param graphql_url: URL of the GraphQL API, e.g. of a fake_graphql_server.FakeGraphQLServer
+        :param graphql_batch_size: Number of issues or pull requests whose items are requested by a single GraphQL query
+        :param user_cache_file: Optional name of a sqlite file to store the profiles of the users in, which can be
+        shared by the GitHubRepo objects of several repositories, see user_cache.UserCache
+        :param format_workers: Number of threads that format the responses into log rows while the next responses are
+        requested, see pipeline.run_pipeline
         """
-        self.authtoken = authtoken
+        if strategy not in COLLECTION_STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy}, expected one of {COLLECTION_STRATEGIES}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+        if backend == "graphql" and (strategy != "per_issue" or timeline):
+            raise ValueError("The graphql backend can not be combined with the repository strategy or the timeline")
+        tokens = [authtoken] if isinstance(authtoken, str) else list(authtoken)
+        self.authtoken = tokens[0]
+        self.tokens = TokenScheduler(tokens, reserve=rate_limit_reserve)
         self.owner = owner
         self.repo = repo
-
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.format_workers = format_workers
+        self.strategy = strategy
+        self.timeline = timeline
+        self.session = _create_session(max(pool_size, concurrency))
+        self.cache = ResponseCache(cache_file) if cache_file is not None else None
+        if replay and archive_directory is None:
+            raise ValueError("Replaying needs an archive_directory")
+        self.archive = ResponseArchive(archive_directory, replay) if archive_directory is not None else None
+        self.checkpoint = Checkpoint(checkpoint_file) if checkpoint_file is not None else None
+        self.retry_policy = RetryPolicy(max_retries=max_retries, budget=retry_budget)
+        self.spill_directory = spill_directory
+        self.backend = backend
+        self.graphql_url = graphql_url
+        self.graphql_batch_size = graphql_batch_size
+        self.user_cache = UserCache(user_cache_file) if user_cache_file is not None else None
+        # Temporary files of the rows of repository wide end points that are collected later, see
+        # __write_repository_listing
+        self._listing_files = {}
+        # Time until which no request is sent because a secondary rate limit was hit, shared by all concurrent requests
+        self._pause_until = 0
+
+        self.since = None
         self.issues = None
         self.pull_requests = None
 
+    def close(self):
+        """
+        Closes the connections to the API that are kept open by the session
+        :return:
+        """
+        self.session.close()
+        self.__drop_issues_and_prs()
+        if self.cache is not None:
+            self.cache.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.user_cache is not None:
+            self.user_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
     # Used API end points:
     # - /issues
     # - /issues/{issue_number}/comments
     # - /issues/{issue_number}/events
     # - /pulls/{pull_number}/reviews
     # - /pulls/comments
+    # - /graphql (with the graphql backend)
 
     # Used fields for information:
     # 'issue_number', 'created_at', "closed_at", 'name', 'title', 'role', 'author_id',  "labels", "assignees", "state"
@@ -46,72 +165,465 @@ class GitHubRepo:
     # Used fields for comment / event logs:
     # 'issue_number', 'count', 'created_at', 'name', 'text', 'role', 'author_id', "labels", "commit_id", "state"
 
-    def __send_request(self, request_url, headers, params):
+    def __send_request(self, request_url, headers, params, data=None):
         """
-        Sends requests to the API of GitHub, if the limit is exceeded, it waits and sends the same request after the
-        timeout. If it returned an server error, the request will be sent again.
+        Sends requests to the API of GitHub with the authtoken that has the most remaining requests, or reads their
+        responses from the archive when replaying. If the limit of all authtokens is exceeded, it waits and sends the
+        same request after the timeout. Server errors, secondary rate limits and connection errors are retried with the
+        delays of the RetryPolicy until it gives up.
         For all other exceptions, an APIResponseError is raised
         :param request_url: URL of the API end point that shall be accessed
-        :param headers: Headers of the http request including the authotken for access
+        :param headers: Headers of the http request, the authtoken for access is set by the TokenScheduler
         :param params: Parameters for the request
+        :param data: Optional json body, the request is sent as POST request then, e.g. for GraphQL queries
         :return: response of the http request if it was successful (Status Code 200)
         """
-        response = requests.get(request_url, headers=headers, params=params)
-        if response.status_code == 200:
-            return response
-        elif response.status_code == 403:
-            if response.headers['X-RateLimit-Remaining'] == '0':
+        if data is not None:
+            # POST requests are archived with their body, they are never answered from the cache
+            params = dict(params or {}, body=json.dumps(data, sort_keys=True))
+        if self.archive is not None and self.archive.replay:
+            return self.__replay_request(request_url, params)
+        endpoint = _endpoint(request_url)
+        # The GraphQL API has its own rate limit
+        resource = "graphql" if data is not None else "core"
+        attempt = 0
+        while True:
+            # Concurrent requests wait as well once one of them hit a secondary rate limit
+            pause = self._pause_until - time.time()
+            if pause > 0:
+                time.sleep(pause)
+                self.retry_policy.record_sleep(endpoint, pause)
+            token = self.tokens.acquire(resource)
+            request_headers = dict(headers, Authorization=f"token {token}")
+            cached = self.cache.get(request_url, params) if self.cache is not None and data is None else None
+            if cached is not None:
+                etag, last_modified, body = cached
+                if etag is not None:
+                    request_headers["If-None-Match"] = etag
+                if last_modified is not None:
+                    request_headers["If-Modified-Since"] = last_modified
+            self.retry_policy.record_request(endpoint)
+            try:
+                if data is None:
+                    response = self.session.get(request_url, headers=request_headers, params=params)
+                else:
+                    response = self.session.post(request_url, headers=request_headers, json=data)
+            except Exception as e:
+                if not self.retry_policy.is_retryable_exception(e):
+                    raise
+                attempt = attempt + 1
+                delay = self.retry_policy.next_delay(endpoint, attempt)
+                if delay is None:
+                    raise
+                print(type(e).__name__, " while requesting ", endpoint, ", retrying in ", round(delay, 1), " seconds")
+                time.sleep(delay)
+                continue
+            self.tokens.update(token, response.headers, resource)
+            if response.status_code == 304 and cached is not None:
+                # Responses that were not modified do not count against the rate limit
+                self.cache.hits += 1
+                response = _with_body(response, cached[2])
+                if self.archive is not None:
+                    self.archive.put(request_url, params, response.content, response.headers.get("Link"))
+                return response
+            if response.status_code == 200:
+                if self.cache is not None and data is None and ("ETag" in response.headers or
+                                                                "Last-Modified" in response.headers):
+                    self.cache.put(request_url, params, response.headers.get("ETag"),
+                                   response.headers.get("Last-Modified"), response.content)
+                if self.archive is not None:
+                    self.archive.put(request_url, params, response.content, response.headers.get("Link"))
+                return response
+            retry_after = _retry_after(response) if response.status_code in (403, 429) else None
+            if response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0':
+                # The TokenScheduler does not use this token until after its reset and waits if no other token is left
+                self.tokens.deny(token, response.headers, resource)
+                attempt = attempt + 1
+                delay = self.retry_policy.next_delay(endpoint, attempt, retry_after=0)
+                if delay is None:
+                    raise APIResponseError("Request limit still exceeded after ", attempt - 1, " retries",
+                                           status_code=403)
                 print("Permission denied, request limit exceeded.")
-                release_time = datetime.fromtimestamp(int(response.headers['X-RateLimit-Reset']))
-                current_time = datetime.now()
-                time_diff = release_time-current_time
-                wait_time = int(time_diff.seconds) + 60
-                print("Waiting until ", release_time, " to retry. Remaining time: ", wait_time, "seconds")
-                time.sleep(wait_time)
-                return self.__send_request(request_url, headers, params)
+                time.sleep(delay)
+            elif retry_after is not None:
+                # Secondary rate limit, e.g. for too many concurrent requests
+                attempt = attempt + 1
+                delay = self.retry_policy.next_delay(endpoint, attempt, retry_after)
+                if delay is None:
+                    raise APIResponseError("Secondary rate limit still exceeded after ", attempt - 1, " retries",
+                                           status_code=response.status_code)
+                print("Secondary rate limit exceeded, waiting ", round(delay, 1), " seconds to retry")
+                self._pause_until = max(self._pause_until, time.time() + delay)
+                time.sleep(delay)
+            elif response.status_code == 403:
+                raise APIResponseError("Error 403 but request limit not exceeded, Access Denied", status_code=403)
+            elif self.retry_policy.is_retryable_status(response.status_code):
+                attempt = attempt + 1
+                delay = self.retry_policy.next_delay(endpoint, attempt)
+                if delay is None:
+                    raise APIResponseError("Error ", response.status_code, ", server error. Giving up after ",
+                                           attempt - 1, " retries", status_code=response.status_code)
+                print("Error ", response.status_code, ", server error. Retrying in ", round(delay, 1), " seconds")
+                time.sleep(delay)
             else:
-                raise APIResponseError("Error 403 but request limit not exceeded, Access Denied")
-        elif response.status_code == 502:
-            print("Error 502, server error. Retrying")
-            time.sleep(5)
-            return self.__send_request(request_url, headers, params)
-        else:
-            raise APIResponseError("Unexpected status code: ", response.status_code)
+                raise APIResponseError("Unexpected status code: ", response.status_code,
+                                       status_code=response.status_code)
+
+    def __replay_request(self, request_url, params):
+        """
+        Reads the response of a request from the archive instead of sending it
+        :param request_url: URL of the API end point
+        :param params: Parameters for the request
+        :return: requests.Response with status code 200 and the archived body
+        """
+        archived = self.archive.get(request_url, params)
+        if archived is None:
+            raise APIResponseError("Response not in the archive: ", request_url, params)
+        body, link = archived
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict({"Link": link} if link is not None else {})
+        response.url = request_url
+        return response
+
+    def __get_all_pages(self, request_url, headers, params):
+        """
+        Collects all pages of an end point of a single issue or pull request
+        :param request_url: URL of the API end point
+        :param headers: Headers of the http request including the authtoken for access
+        :param params: Parameters for the request, the page is counted up starting at 1
+        :return: List of the json items of all pages
+        """
+        items = []
+        # The issues are already collected concurrently, so their pages are requested one after another
+        for page, page_items in self.__iter_pages(request_url, headers, params, prefetch=1):
+            items.extend(page_items)
+        return items
+
+    def __iter_pages(self, request_url, headers, params, start=0, prefetch=None):
+        """
+        Requests the pages of an end point in their order. The pagination follows the Link header of the responses,
+        so no empty page is requested after the last one. Once the Link header contains the number of the last page,
+        the remaining pages are requested in parallel
+        :param request_url: URL of the API end point
+        :param headers: Headers of the http request including the authtoken for access
+        :param params: Parameters for the request, the page is counted up
+        :param start: Number of pages that were already collected by a previous run
+        :param prefetch: Number of pages that are requested at the same time, defaults to the concurrency
+        :return: Generator of tuples (page number, json list of the page)
+        """
+        if prefetch is None:
+            prefetch = self.concurrency
+
+        def fetch(page):
+            while True:
+                response = self.__send_request(request_url, headers=headers, params=dict(params, page=page))
+                try:
+                    return response, response.json()
+                except JSONDecodeError:
+                    print("Error decoding json, retrying")
+
+        page = start + 1
+        response, items = fetch(page)
+        yield page, items
+        last_page = _last_page(response)
+        if last_page is not None and prefetch > 1:
+            with ThreadPoolExecutor(max_workers=prefetch) as executor:
+                pending = deque()
+                for next_page in range(page + 1, last_page + 1):
+                    pending.append(executor.submit(fetch, next_page))
+                    if len(pending) >= prefetch * 2:
+                        page = page + 1
+                        yield page, pending.popleft().result()[1]
+                while pending:
+                    page = page + 1
+                    yield page, pending.popleft().result()[1]
+            return
+        while _has_next_page(response, items, params["per_page"]):
+            page = page + 1
+            response, items = fetch(page)
+            yield page, items
+
+    def __collect_per_issue(self, items, fetch, format_rows, write, description, start=0, save_progress=None,
+                            total=None):
+        """
+        Collects the log rows of each issue or pull request and writes them in the order of the items. The items are
+        requested, formatted and written in a pipeline, see pipeline.run_pipeline, with a concurrency greater than
+        one, that many items are requested at the same time
+        :param items: List of issues, pull requests or their numbers, or an iterator of them together with total
+        :param fetch: Function that requests the responses of a single item
+        :param format_rows: Function that formats an item and its responses into log rows
+        :param write: Function that writes the result of format_rows, e.g. BufferedCSVWriter.write_rows
+        :param description: Name of the collection that is printed with the progress
+        :param start: Number of items that were already collected by a previous run, None if all of them were
+        :param save_progress: Optional function that stores the number of written items in the checkpoint
+        :param total: Number of items if items is an iterator, e.g. of batches that are built while they are collected
+        :return:
+        """
+        if start is None:
+            return
+        if save_progress is None:
+            save_progress = _ignore_progress
+        if total is None:
+            total = len(items)
+        iteration = start
+
+        def write_item(rows):
+            nonlocal iteration
+            write(rows)
+            iteration += 1
+            if iteration % 100 == 0:
+                print("Finished ", description, " Iteration ", iteration, " of ", total)
+                save_progress(iteration)
+
+        run_pipeline(islice(items, start, None), fetch, format_rows, write_item, fetch_workers=self.concurrency,
+                     format_workers=self.format_workers, queue_size=self.concurrency * 2)
+        save_progress(total)
+
+    def __send_graphql(self, query):
+        """
+        Sends a query to the GraphQL API
+        :param query: String containing the GraphQL query
+        :return: Dictionary with the data of the response
+        """
+        response = self.__send_request(self.graphql_url, {}, None, data={"query": query})
+        body = response.json()
+        # Issues that do not exist anymore are returned as null with a NOT_FOUND error, all other errors are fatal
+        errors = [error for error in body.get("errors", []) if error.get("type") != "NOT_FOUND"]
+        if errors or body.get("data") is None:
+            raise APIResponseError("GraphQL query failed: ", errors or body.get("errors"))
+        return body["data"]
+
+    def __collect_graphql(self, items, connection, format_rows, write, description, start=0, save_progress=None):
+        """
+        Collects a connection of the issues or pull requests with the GraphQL backend and writes the log rows of the
+        items in their order. The items are collected in batches of graphql_batch_size, with a concurrency greater than
+        one, several batches are collected at the same time
+        :param items: List of issues, pull requests or their numbers
+        :param connection: One of github_graphql.GRAPHQL_CONNECTIONS
+        :param format_rows: Function that formats an item and the list of its items of the connection in the format
+        of the REST API into log rows
+        :param write: Function that writes the log rows, e.g. BufferedCSVWriter.write_rows
+        :param description: Name of the collection that is printed with the progress
+        :param start: Number of batches that were already collected by a previous run, None if all of them were
+        :param save_progress: Optional function that stores the number of written batches in the checkpoint
+        :return:
+        """
+        # The batches are built while they are collected, so that spilled issues are not all read into the memory
+        item_iterator = iter(items)
+        batches = iter(lambda: list(islice(item_iterator, self.graphql_batch_size)), [])
+        batch_count = -(-len(items) // self.graphql_batch_size)
+
+        def number(item):
+            return item["number"] if isinstance(item, dict) else item
+
+        def fetch(batch):
+            return collect_connection(self.__send_graphql, self.owner, self.repo, [number(item) for item in batch],
+                                      connection, self.graphql_batch_size)
+
+        def format_batch(batch, connections):
+            rows = []
+            for item in batch:
+                rows.extend(format_rows(item, connections[number(item)]))
+            return rows
+
+        self.__collect_per_issue(batches, fetch, format_batch, write, description, start, save_progress,
+                                 total=batch_count)
+
+    def __checkpointed(self):
+        """
+        Whether the progress of the collection is stored in a checkpoint. Incremental runs are short and merge their
+        rows into the logs only at their end, so they are not checkpointed
+        :return: Boolean
+        """
+        return self.checkpoint is not None and self.since is None
+
+    def __resume(self, step, files):
+        """
+        Returns the progress of a step that a previous run did not finish and truncates its files to this progress
+        :param step: Name of the step, e.g. the name of the collecting method
+        :param files: Names of the files that are written by the step
+        :return: Tuple (phase, position) or None if the step starts from the beginning
+        """
+        return self.checkpoint.resume(step, files) if self.__checkpointed() else None
+
+    def __is_finished(self, step, files):
+        """
+        Whether a step was finished by a previous run
+        :param step: Name of the step
+        :param files: Names of the files that are written by the step
+        :return: Boolean
+        """
+        return self.__checkpointed() and self.checkpoint.is_finished(step, files)
+
+    def __save_progress(self, step, phase, writers):
+        """
+        Creates the function that stores the progress of a phase of a step in the checkpoint
+        :param step: Name of the step
+        :param phase: Name of the phase
+        :param writers: Writers of the files of the step, they are flushed before the progress is stored
+        :return: Function taking the number of finished items or pages of the phase
+        """
+        def save_progress(position):
+            if self.__checkpointed():
+                for writer in writers:
+                    writer.flush()
+                self.checkpoint.save(step, phase, position, [writer.file for writer in writers])
+        return save_progress
+
+    def __finish(self, step, files):
+        """
+        Marks a step as finished in the checkpoint, a resumed collection skips it
+        :param step: Name of the step
+        :param files: Names of the closed files of the step
+        :return:
+        """
+        if self.__checkpointed():
+            self.checkpoint.save(step, None, 0, files, done=True)
+
+    def __open_log(self, file, append=False):
+        """
+        Opens the writer of a comment or event log. If only updated issues are collected and the log exists, the rows
+        are merged into the existing log, replacing the rows of the updated issues and pull requests
+        :param file: Name of the csv file of the log
+        :param append: If True, the rows are appended to the log, e.g. when a checkpointed collection is resumed
+        :return: BufferedCSVWriter
+        """
+        if self.since is None or not os.path.exists(file):
+            return _initialize_csv(file, self.chunk_size, append=append)
+        issue_numbers = {str(item["number"]) for items in (self.get_issues(), self.get_pull_requests())
+                         for item in items}
+        return _MergingLogWriter(file, issue_numbers, self.chunk_size)
+
+    def __save_information(self, info_df, file):
+        """
+        Saves the general information on issues or pull requests. If only updated issues are collected and the file
+        exists, the rows of the updated issues replace their rows in the existing file
+        :param info_df: DataFrame generated by get_issue_information or get_pull_request_information
+        :param file: Name of the csv file
+        :return:
+        """
+        if self.since is not None and os.path.exists(file):
+            existing_df = pd.read_csv(file, index_col=0)
+            if not info_df.empty:
+                existing_df = existing_df[~existing_df["issue:number"].isin(info_df["issue:number"])]
+                # The API returns the newest issues first
+                info_df = pd.concat([info_df, existing_df]).sort_values(by=["issue:number"], ascending=False)
+                info_df = info_df.reset_index(drop=True)
+            else:
+                info_df = existing_df
+        info_df.to_csv(file)
+
+    def __write_all_pages(self, request_url, headers, params, format_response, write, description, start=0,
+                          save_progress=None):
+        """
+        Collects all pages of a repository wide end point and writes the log rows of each page. The pages are
+        formatted and written in a pipeline, see pipeline.run_pipeline, while the next pages are requested
+        :param request_url: URL of the API end point
+        :param headers: Headers of the http request including the authtoken for access
+        :param params: Parameters for the request, the page is counted up starting at 1
+        :param format_response: Function that formats the json list of a response into log rows
+        :param write: Function that writes the result of format_response, e.g. BufferedCSVWriter.write_rows
+        :param description: Name of the collected items that is printed with the progress
+        :param start: Number of pages that were already collected by a previous run, None if all of them were
+        :param save_progress: Optional function that stores the number of written pages in the checkpoint
+        :return:
+        """
+        if start is None:
+            return
+        if save_progress is None:
+            save_progress = _ignore_progress
+
+        def write_page(page_rows):
+            page, rows = page_rows
+            print("Collecting ", description, " page: ", page, "; ", description, " per page: ", params["per_page"])
+            # Pages may contain no rows at all if none of their items belongs to the collected issues
+            write(rows)
+            save_progress(page)
+
+        # The pages are requested by the generator, which requests concurrency pages at the same time itself
+        run_pipeline(self.__iter_pages(request_url, headers, params, start), lambda page_items: page_items,
+                     lambda page_items, fetched: (fetched[0], format_response(fetched[1])), write_page,
+                     format_workers=self.format_workers, queue_size=self.concurrency * 2)
+
+    def __uses_repository_listings(self):
+        """
+        Whether the comments and events are collected from the repository wide end points. Incremental runs always
+        collect them per issue, as all rows of an updated issue are replaced
+        :return: Boolean
+        """
+        return self.strategy == "repository" and self.since is None
 
     # -------- Send Request to GitHub API to get general information about pull requests and issues -------- #
     def __get_issues_and_prs(self):
         """
         Saves the general issue and pull request information as dictionaries for each issue into the class`
-        attributes issues  and pullrequests
+        attributes issues  and pullrequests. Only the fields that are used to build the logs are kept, see
+        _project_issue
         :return:
         """
         if self.issues is None:
             request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues"
             params = {"state": "all", "page": 1, "per_page": 100, "pulls": False}
+            if self.since is not None:
+                params["since"] = self.since
             headers = {"Authorization": f"token {self.authtoken}"}
-            issue_list = []
-            pr_list = []
-            while True:
-                print("Collecting issues, page: ", params["page"], "; issues per page: ", 100)
-                response = self.__send_request(request_url, headers=headers, params=params)
-                json_list = response.json()
-                current_issues = [i for i in json_list if 'pull_request' not in i.keys()]
-                current_prs = [i for i in json_list if 'pull_request' in i.keys()]
-                issue_list = issue_list + current_issues
-                pr_list = pr_list + current_prs
-                if len(json_list) == 0:
-                    print("Collected all issues")
-                    break
-                params["page"] = params["page"] + 1
+            issue_list = self.__new_item_list()
+            pr_list = self.__new_item_list()
+            # With a checkpoint, the pages are also stored on disk, one json list per line, to resume the listing
+            pages_file = self.checkpoint.file + ".issues.jsonl" if self.__checkpointed() else None
+            finished = self.__is_finished("issues", [pages_file])
+            progress = self.__resume("issues", [pages_file])
+            resumed_pages = 0
+            for json_list in _read_pages(pages_file) if finished or progress is not None else []:
+                _split_issues_and_prs(json_list, issue_list, pr_list)
+                resumed_pages = resumed_pages + 1
+            pages_handle = open(pages_file, "a" if resumed_pages else "w", encoding="utf-8") if pages_file else None
+            for page, json_list in self.__iter_pages(request_url, headers, params, start=resumed_pages) \
+                    if not finished else []:
+                print("Collecting issues, page: ", page, "; issues per page: ", 100)
+                json_list = _split_issues_and_prs(json_list, issue_list, pr_list)
+                if pages_handle is not None:
+                    pages_handle.write(json.dumps(json_list) + "\n")
+                    pages_handle.flush()
+                    self.checkpoint.save("issues", "issues", page, [pages_file])
+            print("Collected all issues")
+            if pages_handle is not None:
+                pages_handle.close()
+                self.__finish("issues", [pages_file])
             self.issues = issue_list
             self.pull_requests = pr_list
         else:
             pass
 
+    def __new_item_list(self):
+        """
+        Creates the list that the issues or pull requests are stored in
+        :return: List, or a sequence backed by a temporary file if a spill_directory is set
+        """
+        return _SpilledItems(self.spill_directory) if self.spill_directory is not None else []
+
+    def __drop_issues_and_prs(self):
+        """
+        Forgets the collected issues and pull requests, e.g. to collect only the updated ones, and deletes their
+        temporary files
+        :return:
+        """
+        for items in (self.issues, self.pull_requests):
+            if isinstance(items, _SpilledItems):
+                items.close()
+        # The rows kept from a repository wide end point belong to the forgotten issues
+        for listing_file in self._listing_files.values():
+            os.remove(listing_file)
+        self._listing_files = {}
+        self.issues = None
+        self.pull_requests = None
+
     def get_issues(self):
         """
         Getter for the issues list of the repository
-        :return: List of dictionaries that contain information on each issue
+        :return: List of dictionaries that contain the used information on each issue
         """
         self.__get_issues_and_prs()
         return self.issues
@@ -119,7 +631,7 @@ class GitHubRepo:
     def get_pull_requests(self):
         """
         Getter for the pull request list of the repository
-        :return: List of dictionaries that contain information on each pull request
+        :return: List of dictionaries that contain the used information on each pull request
         """
         self.__get_issues_and_prs()
         return self.pull_requests
@@ -128,38 +640,95 @@ class GitHubRepo:
 
     def get_username_to_mail_mapping(self, log,
                                      saving_directory="",
-                                     user_name_key="author:name"):
+                                     user_name_key="author:name",
+                                     git_log=None,
+                                     mailmap=None):
         """
         Takes a generated log of an repository and generates a mapping from user names to corresponding mail addresses
         :param log: Log to build the mapping from
         :param saving_directory: Directory to save the mapping in
         :param user_name_key: Name of the column of the GitHub user names
+        :param git_log: Optional commit log of the repository (git_information.GitRepo.get_commit_information), the
+        noreply addresses of GitHub in it are used to map user names without requests to the API
+        :param mailmap: Optional path to the .mailmap file of the repository, mail addresses that it groups together
+        with a noreply address of GitHub are used to map user names without requests to the API
         :return: DataFrame mapping GitHub user names to corresponding mail addresses if they are public on GitHub
         """
         user_mapping_path = saving_directory + f'/{self.repo}_user_mappings.csv'
         # GitHub's API on Issues does not return the email address of users and thus it has to be collected manually
         users = list(set(log[user_name_key]))
-        mails = []
-        iteration = 1
+        mails = {}
         max_iteration = len(users)
         print(f"Found Users for {self.repo}: ", max_iteration)
+        # Users whose mail address is known locally or from the user cache do not need a request to the API
+        resolver = IdentityResolver(git_log=git_log, mailmap=mailmap)
+        resolved_locally = 0
+        cached = 0
+        unknown_users = []
         for user in users:
-            if iteration % 100 == 0:
-                print(f"Collecting User Information - {self.repo} - Iteration ", iteration, " of ", max_iteration)
-            url = f"https://api.github.com/users/{user}"
-            headers = {"Authorization": f"token {self.authtoken}"}
-            try:
-                response = self.__send_request(request_url=url, headers=headers, params={})
-                mails.append(response.json()['email'])
-            except APIResponseError:
-                print("User not found, account probably deleted.")
-                mails.append(None)
-            iteration += 1
-        df = pd.DataFrame({'author:name': users, 'author:email': mails})
+            if not isinstance(user, str):
+                # Missing user names in the log, they can not be requested
+                mails[user] = None
+                continue
+            local_mail = resolver.resolve(user)
+            cache_entry = self.user_cache.get(user) if self.user_cache is not None and local_mail is None else None
+            if local_mail is not None:
+                mails[user] = local_mail
+                resolved_locally += 1
+            elif cache_entry is not None:
+                mails[user] = cache_entry[1]["email"] if cache_entry[0] else None
+                cached += 1
+            else:
+                unknown_users.append(user)
+        self.__lookup_users(unknown_users, mails)
+        print(f"Resolved {resolved_locally} of {max_iteration} users locally, {cached} from the user cache, "
+              f"{len(unknown_users)} with the API")
+        df = pd.DataFrame({'author:name': users, 'author:email': [mails[user] for user in users]})
         df.to_csv(user_mapping_path)
         print("Saved user mapping to: " + user_mapping_path)
         return
 
+    def __lookup_users(self, users, mails):
+        """
+        Requests the profiles of users from the API and stores them in the user cache. With the graphql backend, the
+        profiles of graphql_batch_size users are requested by a single query, with a concurrency greater than one,
+        several users or batches are requested at the same time
+        :param users: List of the login names of the users
+        :param mails: Dictionary that the public mail address or None is added to for each user
+        :return:
+        """
+        if self.backend == "graphql":
+            batches = [users[i:i + self.graphql_batch_size] for i in range(0, len(users), self.graphql_batch_size)]
+
+            def fetch(batch):
+                return collect_users(self.__send_graphql, batch)
+        else:
+            batches = [[user] for user in users]
+            headers = {"Authorization": f"token {self.authtoken}"}
+
+            def fetch(batch):
+                try:
+                    response = self.__send_request(request_url=f"https://api.github.com/users/{batch[0]}",
+                                                   headers=headers, params={})
+                    return {batch[0]: response.json()}
+                except APIResponseError as e:
+                    if e.status_code == 404:
+                        print("User not found, account probably deleted.")
+                        return {batch[0]: None}
+                    # Other errors may not occur on the next run, so the user is not cached
+                    print("Could not look up user ", batch[0], ", error ", e.status_code, ", not caching the result")
+                    return {batch[0]: e}
+
+        def write(profiles):
+            for user, profile in profiles.items():
+                mails[user] = profile["email"] if isinstance(profile, dict) else None
+            if self.user_cache is not None:
+                self.user_cache.put_many({user: profile for user, profile in profiles.items()
+                                          if not isinstance(profile, APIResponseError)})
+
+        self.__collect_per_issue(batches, fetch, lambda batch, profiles: profiles, write,
+                                 "get_username_to_mail_mapping")
+
     # ------------------------------ GET INFORMATION ABOUT ISSUES AND PULLS ------------------------------ #
 
     def get_issue_information(self):
@@ -230,40 +799,48 @@ class GitHubRepo:
         :return:
         """
         print("Collecting issue's comments log")
-        _initialize_csv(file)
-        params = {"state": "all", "page": 1, "per_page": 100}
-        headers = {"Authorization": f"token {self.authtoken}"}
-        issues = self.get_issues()
-        # The first comments of each issue are not returned by the API, they are the body of the /issues end point and
-        # can be retrieved from there
-        firstcomments = []
-        for i in issues:
-            firstcommentdict = {"issue:number": i["number"], "issue:type": "issue",
-                                "timestamp": i["created_at"], "author:name": i["user"]["login"],
-                                "author:id": i["user"]["id"], "author:association": i["author_association"],
-                                "message": i["body"], "commit:hash": "No commit hash", "activity": "opened issue"}
-            firstcomments.append(firstcommentdict)
-        df = pd.DataFrame(firstcomments)
-        _append_to_csv(df, file)
-        # Now all other comments can be retrieved
-        iteration = 1
-        maxiteration = len(issues)
-        for i in issues:
-            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{i['number']}/comments"
-            while True:
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_issue_comment_response(comments, issue_type=IssueType.ISSUE))
-                if df.empty:
-                    break
-                _append_to_csv(df, file)
-                params["page"] = params["page"] + 1
-                if len(comments) < 100:
-                    break
-            params["page"] = 1
-            if iteration % 100 == 0:
-                print("Finished iteration ", iteration, " of ", maxiteration)
-            iteration = iteration+1
+        step, phases = "get_issues_comments", ["opened", "comments"]
+        if self.__is_finished(step, [file]):
+            print("Issue comments were already collected by a previous run")
+            return
+        progress = self.__resume(step, [file])
+        with self.__open_log(file, append=progress is not None) as writer:
+            params = {"state": "all", "page": 1, "per_page": 100}
+            headers = {"Authorization": f"token {self.authtoken}"}
+            issues = self.get_issues()
+            # The first comments of each issue are not returned by the API, they are the body of the /issues end
+            # point and can be retrieved from there
+            if phase_start(progress, phases, "opened") == 0:
+                for i in issues:
+                    firstcommentdict = {"issue:number": i["number"], "issue:type": "issue",
+                                        "timestamp": i["created_at"], "author:name": i["user"]["login"],
+                                        "author:id": i["user"]["id"], "author:association": i["author_association"],
+                                        "message": i["body"], "commit:hash": "No commit hash",
+                                        "activity": "opened issue"}
+                    writer.write_row(firstcommentdict)
+                self.__save_progress(step, "opened", [writer])(1)
+            # Now all other comments can be retrieved
+            start = phase_start(progress, phases, "comments")
+            save_progress = self.__save_progress(step, "comments", [writer])
+            if self.__uses_repository_listings():
+                self.__write_repository_listing("comments", IssueType.ISSUE, writer, start, save_progress)
+            elif self.backend == "graphql":
+                self.__collect_graphql(issues, "comments",
+                                       lambda issue, comments: _format_issue_comment_response(comments,
+                                                                                              IssueType.ISSUE),
+                                       writer.write_rows, "get_issues_comments", start, save_progress)
+            else:
+
+                def fetch(issue):
+                    request_url = (f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{issue['number']}"
+                                   f"/comments")
+                    return self.__get_all_pages(request_url, headers, params)
+
+                self.__collect_per_issue(issues, fetch,
+                                         lambda issue, comments: _format_issue_comment_response(comments,
+                                                                                                IssueType.ISSUE),
+                                         writer.write_rows, "get_issues_comments", start, save_progress)
+        self.__finish(step, [file])
         return
 
     def get_issues_events(self, file):
@@ -272,30 +849,36 @@ class GitHubRepo:
         :param file: The name of the csv file to save the issue's events log in
         :return:
         """
-        _initialize_csv(file)
-        self.get_pull_requests()
-        params = {"page": 1, "per_page": 100}
-        headers = {"Authorization": f"token {self.authtoken}"}
-        issues = [i["number"] for i in self.issues]
-        iteration = 1
-        maxiteration = len(issues)
-        for i in issues:
-            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{i}/events"
-            params["page"] = 1
-            while True:
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_event_response(comments, issue_number=i,
-                                                         issue_type=IssueType.ISSUE.value))
-                if df.empty:
-                    break
-                _append_to_csv(df, file)
-                params["page"] = params["page"] + 1
-                if len(comments) < 100:
-                    break
-            if iteration % 100 == 0:
-                print("Finished get_issues_events Iteration ", iteration, " of ", maxiteration)
-            iteration = iteration + 1
+        step = "get_issues_events"
+        if self.__is_finished(step, [file]):
+            print("Issue events were already collected by a previous run")
+            return
+        progress = self.__resume(step, [file])
+        with self.__open_log(file, append=progress is not None) as writer:
+            self.get_pull_requests()
+            params = {"page": 1, "per_page": 100}
+            headers = {"Authorization": f"token {self.authtoken}"}
+            issues = [i["number"] for i in self.issues]
+            start = phase_start(progress, ["events"], "events")
+            save_progress = self.__save_progress(step, "events", [writer])
+            if self.__uses_repository_listings():
+                self.__write_repository_listing("events", IssueType.ISSUE, writer, start, save_progress)
+            elif self.backend == "graphql":
+                self.__collect_graphql(issues, "events",
+                                       lambda issue_number, events: _format_event_response(
+                                           events, issue_number=issue_number, issue_type=IssueType.ISSUE.value),
+                                       writer.write_rows, "get_issues_events", start, save_progress)
+            else:
+
+                def fetch(issue_number):
+                    request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{issue_number}/events"
+                    return self.__get_all_pages(request_url, headers, params)
+
+                self.__collect_per_issue(issues, fetch,
+                                         lambda issue_number, events: _format_event_response(
+                                             events, issue_number=issue_number, issue_type=IssueType.ISSUE.value),
+                                         writer.write_rows, "get_issues_events", start, save_progress)
+        self.__finish(step, [file])
         return
 
     # ------------------------------ GET LOGS OF EVENTS AND COMMENTS ON PULL REQUESTS ------------------------------ #
@@ -315,82 +898,78 @@ class GitHubRepo:
         # /pulls/{pr_number}/comments
         # (the body of) /issues
         print("Collecting pull request's comments log")
-        _initialize_csv(file)
-        params = {"state": "all", "page": 1, "per_page": 100}
-        headers = {"Authorization": f"token {self.authtoken}"}
-        prs = self.get_pull_requests()
-        i = 0
-        max_iteration = len(prs)
-        while i < max_iteration:
-            pr = prs[i]
-            # Save the body of the creation comment as it is not returned by the comment end points
-            if i % 100 == 0:
-                print("Finished get_pull_request_comments Iteration ", i, " of ", max_iteration)
-            firstcommentdict = {"issue:number": pr["number"],
-                                "issue:type": IssueType.PULL_REQUEST.value,
-                                "timestamp": pr["created_at"],
-                                "author:name": pr["user"]["login"],
-                                "author:id": pr["user"]["id"],
-                                "author:association": pr["author_association"],
-                                "message": pr["body"],
-                                "commit:hash": "No commit hash",
-                                "activity": "opened pull request"}
-            df = pd.DataFrame([firstcommentdict])
-            _append_to_csv(df, file)
-            # Get Reviews of each Pull Request
-            pr_number = pr['number']
-            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/{pr_number}/reviews"
-            response = self.__send_request(request_url, headers=headers, params=params)
-            comments = response.json()
-            df = pd.DataFrame(_format_pr_review_response(comments))
-            while not df.empty:
-                _append_to_csv(df, file)
-                if len(comments) < 100:
-                    break
-                params["page"] = params["page"] + 1
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_pr_review_response(comments))
-            params["page"] = 1
-            i = i + 1
-        # Get Review Comments of all Pull Requests
-        # The /pulls/comments end point has not pagination limit so that it can be used
-        params = {"state": "all", "page": 1, "per_page": 50}
-        request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/comments"
-        while True:
-            try:
-                print("Collecting review comments page: ", params["page"], "; reviewcomments per page: ", params["per_page"])
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_pr_reviewcomment_response(comments))
-                if df.empty:
-                    print("Collected all comments")
-                    break
-                _append_to_csv(df, file)
-                params["page"] = params["page"] + 1
-            except JSONDecodeError:
-                print("Error decoding json, retrying")
-                continue
-        # Get Issue Comments of each pull request
-        iteration = 1
-        maxiteration = len(prs)
-        params = {"state": "all", "page": 1, "per_page": 100}
-        for pr in prs:
-            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{pr['number']}/comments"
-            while True:
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_issue_comment_response(comments, issue_type=IssueType.PULL_REQUEST))
-                if df.empty:
-                    break
-                _append_to_csv(df, file)
-                params["page"] = params["page"] + 1
-                if len(comments) < 100:
-                    break
-            params["page"] = 1
-            if iteration % 100 == 0:
-                print("Finished iteration ", iteration, " of ", maxiteration)
-            iteration = iteration + 1
+        step, phases = "get_pull_request_comments", ["reviews", "review_comments", "comments"]
+        if self.__is_finished(step, [file]):
+            print("Pull request comments were already collected by a previous run")
+            return
+        progress = self.__resume(step, [file])
+        with self.__open_log(file, append=progress is not None) as writer:
+            params = {"state": "all", "page": 1, "per_page": 100}
+            headers = {"Authorization": f"token {self.authtoken}"}
+            prs = self.get_pull_requests()
+
+            def fetch_reviews(pr):
+                request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/{pr['number']}/reviews"
+                return self.__get_all_pages(request_url, headers, params)
+
+            def format_reviews(pr, reviews):
+                # Reviews of each Pull Request, after the row of the creation comment
+                return [_opened_pull_request_row(pr)] + _format_pr_review_response(reviews)
+
+            if self.backend == "graphql":
+                self.__collect_graphql(prs, "reviews", format_reviews, writer.write_rows, "get_pull_request_comments",
+                                       phase_start(progress, phases, "reviews"),
+                                       self.__save_progress(step, "reviews", [writer]))
+            else:
+                self.__collect_per_issue(prs, fetch_reviews, format_reviews, writer.write_rows,
+                                         "get_pull_request_comments", phase_start(progress, phases, "reviews"),
+                                         self.__save_progress(step, "reviews", [writer]))
+            # Get Review Comments of all Pull Requests
+            # The /pulls/comments end point has not pagination limit so that it can be used
+            start = phase_start(progress, phases, "review_comments")
+            save_progress = self.__save_progress(step, "review_comments", [writer])
+            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/comments"
+            if self.backend == "graphql":
+                self.__collect_graphql(prs, "review_comments",
+                                       lambda pr, comments: _format_pr_reviewcomment_response(comments),
+                                       writer.write_rows, "get_pull_request_comments", start, save_progress)
+            elif self.since is not None:
+                # Only the review comments of the updated pull requests are needed, as all their rows are replaced
+
+                def fetch_review_comments(pr):
+                    request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/pulls/{pr['number']}/comments"
+                    return self.__get_all_pages(request_url, headers, {"page": 1, "per_page": 100})
+
+                self.__collect_per_issue(prs, fetch_review_comments,
+                                         lambda pr, comments: _format_pr_reviewcomment_response(comments),
+                                         writer.write_rows, "get_pull_request_comments")
+            else:
+                self.__write_all_pages(request_url, headers, {"state": "all", "page": 1, "per_page": 50},
+                                       _format_pr_reviewcomment_response, writer.write_rows, "review comments", start,
+                                       save_progress)
+            # Get Issue Comments of each pull request
+            params = {"state": "all", "page": 1, "per_page": 100}
+            start = phase_start(progress, phases, "comments")
+            save_progress = self.__save_progress(step, "comments", [writer])
+            if self.__uses_repository_listings():
+                self.__write_repository_listing("comments", IssueType.PULL_REQUEST, writer, start, save_progress)
+            elif self.backend == "graphql":
+                self.__collect_graphql(prs, "comments",
+                                       lambda pr, comments: _format_issue_comment_response(comments,
+                                                                                           IssueType.PULL_REQUEST),
+                                       writer.write_rows, "get_pull_request_comments", start, save_progress)
+            else:
+
+                def fetch_comments(pr):
+                    request_url = (f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{pr['number']}"
+                                   f"/comments")
+                    return self.__get_all_pages(request_url, headers, params)
+
+                self.__collect_per_issue(prs, fetch_comments,
+                                         lambda pr, comments: _format_issue_comment_response(comments,
+                                                                                             IssueType.PULL_REQUEST),
+                                         writer.write_rows, "get_pull_request_comments", start, save_progress)
+        self.__finish(step, [file])
         return
 
     def get_pull_request_events(self, file):
@@ -399,35 +978,141 @@ class GitHubRepo:
         :param file: The name of teh csv file to save the pull request's events log in
         :return:
         """
-        _initialize_csv(file)
+        step = "get_pull_request_events"
+        if self.__is_finished(step, [file]):
+            print("Pull request events were already collected by a previous run")
+            return
+        progress = self.__resume(step, [file])
+        with self.__open_log(file, append=progress is not None) as writer:
+            self.get_pull_requests()
+            params = {"page": 1, "per_page": 100}
+            headers = {"Authorization": f"token {self.authtoken}"}
+            prs = [pr["number"] for pr in self.pull_requests]
+            start = phase_start(progress, ["events"], "events")
+            save_progress = self.__save_progress(step, "events", [writer])
+            if self.__uses_repository_listings():
+                self.__write_repository_listing("events", IssueType.PULL_REQUEST, writer, start, save_progress)
+            elif self.backend == "graphql":
+                self.__collect_graphql(prs, "events",
+                                       lambda pr_number, events: _format_event_response(
+                                           events, issue_number=pr_number, issue_type=IssueType.PULL_REQUEST.value),
+                                       writer.write_rows, "get_pull_request_events", start, save_progress)
+            else:
+
+                def fetch(pr_number):
+                    request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{pr_number}/events"
+                    return self.__get_all_pages(request_url, headers, params)
+
+                self.__collect_per_issue(prs, fetch,
+                                         lambda pr_number, events: _format_event_response(
+                                             events, issue_number=pr_number, issue_type=IssueType.PULL_REQUEST.value),
+                                         writer.write_rows, "get_pull_request_events", start, save_progress)
+        self.__finish(step, [file])
+        return
+
+    def __write_repository_listing(self, listing, issue_type, writer, start=0, save_progress=None):
+        """
+        Collects the comments or events of the issues or of the pull requests from the repository wide end point. The
+        end point returns the items of both, so it is only paged once: the rows of the other type are kept in a
+        temporary file, which is written instead of paging the end point again when they are collected
+        :param listing: Either "comments" or "events"
+        :param issue_type: Type of the collected issues, either pull request or issue
+        :param writer: BufferedCSVWriter to write the rows into
+        :param start: Number of pages that were already collected by a previous run, None if all of them were
+        :param save_progress: Optional function that stores the number of written pages in the checkpoint
+        :return:
+        """
+        stored_file = self._listing_files.pop((listing, issue_type), None)
+        if stored_file is not None:
+            if start is not None:
+                print("Writing the ", issue_type.value, " ", listing, " of the already collected ", listing, " listing")
+                writer.write_file(stored_file)
+            os.remove(stored_file)
+            return
+        if start is None:
+            return
+        other_type = IssueType.PULL_REQUEST if issue_type == IssueType.ISSUE else IssueType.ISSUE
         self.get_pull_requests()
-        params = {"page": 1, "per_page": 100}
+        numbers = {IssueType.ISSUE: {i["number"] for i in self.issues},
+                   IssueType.PULL_REQUEST: {pr["number"] for pr in self.pull_requests}}
+
+        def format_rows(items, item_type):
+            if listing == "comments":
+                return _format_repository_comment_response(items, numbers[item_type], item_type)
+            return _format_repository_event_response(items, numbers[item_type], item_type.value)
+
+        # The rows of the other type are only complete if the end point is paged from the beginning
+        other_writer = None
+        if start == 0:
+            handle, other_file = tempfile.mkstemp(suffix=".csv", dir=self.spill_directory)
+            os.close(handle)
+            other_writer = BufferedCSVWriter(other_file, _LOG_COLUMNS, chunk_size=self.chunk_size, append=True)
+
+        def write(rows):
+            writer.write_rows(rows[0])
+            if other_writer is not None:
+                other_writer.write_rows(rows[1])
+
+        request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{listing}"
         headers = {"Authorization": f"token {self.authtoken}"}
-        prs = [pr["number"] for pr in self.pull_requests]
-        iteration = 1
-        maxiteration = len(prs)
-        for pr in prs:
-            request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{pr}/events"
-            params["page"] = 1
-            while True:
-                response = self.__send_request(request_url, headers=headers, params=params)
-                comments = response.json()
-                df = pd.DataFrame(_format_event_response(comments, issue_number=pr,
-                                                         issue_type=IssueType.PULL_REQUEST.value))
-                if df.empty:
-                    break
-                _append_to_csv(df, file)
-                params["page"] = params["page"] + 1
-                if len(comments) < 100:
-                    break
-            if iteration % 100 == 0:
-                print("Finished get_pullrequest_events Iteration ", iteration, " of ", maxiteration)
-            iteration = iteration+1
+        try:
+            self.__write_all_pages(request_url, headers, {"page": 1, "per_page": 100},
+                                   lambda items: (format_rows(items, issue_type),
+                                                  format_rows(items, other_type) if other_writer is not None else []),
+                                   write, f"{issue_type.value} {listing}", start, save_progress)
+        except BaseException:
+            if other_writer is not None:
+                other_writer.close()
+                os.remove(other_file)
+            raise
+        if other_writer is not None:
+            other_writer.close()
+            self._listing_files[(listing, other_type)] = other_file
+
+    def get_pull_request_timeline(self, comments_file, events_file):
+        """
+        Gets the logs of the comments and of the events of pull requests from the timeline end point, which returns
+        the issue comments, reviews, review comments and events of a pull request in one chronologically ordered
+        stream. The rows are the same as the ones of get_pull_request_comments and get_pull_request_events
+        :param comments_file: Name of the csv file to save the comment log in
+        :param events_file: Name of the csv file to save the event log in
+        :return:
+        """
+        print("Collecting pull request's timeline")
+        step, files = "get_pull_request_timeline", [comments_file, events_file]
+        if self.__is_finished(step, files):
+            print("Pull request timelines were already collected by a previous run")
+            return
+        progress = self.__resume(step, files)
+        with self.__open_log(comments_file, append=progress is not None) as comments_writer, \
+                self.__open_log(events_file, append=progress is not None) as events_writer:
+            headers = {"Authorization": f"token {self.authtoken}"}
+            prs = self.get_pull_requests()
+
+            def fetch(pr):
+                request_url = f"https://api.github.com/repos/{self.owner}/{self.repo}/issues/{pr['number']}/timeline"
+                return self.__get_all_pages(request_url, headers, {"page": 1, "per_page": 100})
+
+            def format_timeline(pr, items):
+                rows = _format_timeline_response(items, pr["number"])
+                # The body of the creation comment is not part of the timeline
+                return ([_opened_pull_request_row(pr)] +
+                        [row for row in rows if row["activity"] in _TIMELINE_COMMENT_ACTIVITIES],
+                        [row for row in rows if row["activity"] not in _TIMELINE_COMMENT_ACTIVITIES])
+
+            def write(rows):
+                comments_writer.write_rows(rows[0])
+                events_writer.write_rows(rows[1])
+
+            self.__collect_per_issue(prs, fetch, format_timeline, write, "get_pull_request_timeline",
+                                     phase_start(progress, ["timeline"], "timeline"),
+                                     self.__save_progress(step, "timeline", [comments_writer, events_writer]))
+        self.__finish(step, files)
         return
 
     # -------------------- Method to build an entire log from a given repo -------------------- #
 
-    def build_logs(self, saving_directory=""):
+    def build_logs(self, saving_directory="", incremental=False):
         """
         Calls the build_issue_log and build_pull_request_log methods of this class and generates log DataFrames for:
         - General Issue information (No log)
@@ -442,8 +1127,26 @@ class GitHubRepo:
         - An event log combining all previous information
         All DataFrames are stored in the saving_directory with default_names
         :param saving_directory: Directory to save the built logs in
+        :param incremental: If True and the logs of a previous run exist, only the issues and pull requests that were
+        updated since the previous run are collected, and their rows replace the rows of the same issues in the logs.
+        The time of the last run is stored in {repo}_sync_state.json in the saving_directory
         :return:
         """
+        state_file = saving_directory + f"/{self.repo}_sync_state.json"
+        # Issues updated while this run is collecting are collected again by the next run, the overlap guards against
+        # differences between the local clock and the one of GitHub
+        sync_time = (datetime.now(timezone.utc) - _SYNC_OVERLAP).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if incremental:
+            log_names = ["issue_info", "issue_comments", "issue_events", "pulls_info", "pulls_comments",
+                         "pulls_events"]
+            since = _read_sync_state(state_file, [saving_directory + f"/{self.repo}_{name}.csv" for name in log_names])
+            if since is None:
+                print("No complete previous run found, collecting all issues and pull requests")
+            else:
+                print("Collecting issues and pull requests updated since ", since)
+            if since != self.since:
+                self.since = since
+                self.__drop_issues_and_prs()
         issue_log_path = saving_directory + f"/{self.repo}_issue_log.csv"
         pull_log_path = saving_directory + f"/{self.repo}_pulls_log.csv"
         log_path = saving_directory + f"/{self.repo}_log.csv"
@@ -472,6 +1175,18 @@ class GitHubRepo:
         info_df.to_csv(info_path)
         print("Log information saved to file: " + info_path)
 
+        _write_sync_state(state_file, sync_time)
+        if self.checkpoint is not None:
+            # The whole collection is finished, a new run starts from the beginning
+            if os.path.exists(self.checkpoint.file + ".issues.jsonl"):
+                os.remove(self.checkpoint.file + ".issues.jsonl")
+            self.checkpoint.remove()
+        if self.cache is not None:
+            print("Requests answered from the cache: ", self.cache.hits)
+        for endpoint, statistics in sorted(self.retry_policy.statistics().items()):
+            if statistics["retries"] or statistics["sleep_seconds"]:
+                print("Retries of ", endpoint, ": ", statistics["retries"], " of ", statistics["requests"],
+                      " requests, waited ", round(statistics["sleep_seconds"], 1), " seconds")
         print("All csv files were saved in directory: " + saving_directory)
         return
 
@@ -493,7 +1208,7 @@ class GitHubRepo:
 
         print("Collect Issue Information")
         issue_info_df = self.get_issue_information()
-        issue_info_df.to_csv(issue_info_path)
+        self.__save_information(issue_info_df, issue_info_path)
         print("Saved issue information to: " + issue_info_path)
 
         print("Collect Issue Comments")
@@ -532,16 +1247,19 @@ class GitHubRepo:
 
         print("Collect Pull Request Information")
         pr_info_df = self.get_pull_request_information()
-        pr_info_df.to_csv(pr_info_path)
+        self.__save_information(pr_info_df, pr_info_path)
         print("Saved pull request information to: " + pr_info_path)
 
-        print("Collect Pull Request Comments")
-        self.get_pull_request_comments(pr_comments_path)
+        if self.timeline:
+            print("Collect Pull Request Comments and Events")
+            self.get_pull_request_timeline(pr_comments_path, pr_event_path)
+        else:
+            print("Collect Pull Request Comments")
+            self.get_pull_request_comments(pr_comments_path)
+            print("Collect Pull Request Events")
+            self.get_pull_request_events(pr_event_path)
         pr_comment_df = pd.read_csv(pr_comments_path)
         print("Saved pull requests comments, reviews and review comments log to: " + pr_comments_path)
-
-        print("Collect Pull Request Events")
-        self.get_pull_request_events(pr_event_path)
         pr_event_df = pd.read_csv(pr_event_path)
         print("Saved pull request events to: " + pr_event_path)
 
@@ -554,32 +1272,324 @@ class GitHubRepo:
         return
 
 
+# Strategies to collect the comments and events, see GitHubRepo
+COLLECTION_STRATEGIES = ["per_issue", "repository"]
+
+# APIs the comments, reviews, review comments and events are collected from
+BACKENDS = ["rest", "graphql"]
+
+
+# ------------------------------ HTTP SESSION ------------------------------ #
+
+
+def _create_session(pool_size=10):
+    """
+    Creates the session that all requests of a GitHubRepo are sent with. The session keeps the connections to the API
+    alive, so that the TCP and TLS handshakes are only needed once per connection instead of once per request
+    :param pool_size: Maximum number of connections that are kept open for reuse
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # The responses are transferred compressed, requests decompresses them transparently
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    return session
+
+
+def _with_body(response, body):
+    """
+    Turns a 304 Not Modified response into a successful response with the cached body
+    :param response: requests.Response with status code 304
+    :param body: Cached body of the response as bytes
+    :return: The response with status code 200 and the cached body
+    """
+    response.status_code = 200
+    response._content = body
+    return response
+
+
+def _endpoint(request_url):
+    """
+    Names the end point of a request URL for the retry statistics, issue and pull request numbers are replaced
+    :param request_url: URL of the API end point
+    :return: Path of the end point, e.g. /repos/{owner}/{repo}/issues/{number}/comments
+    """
+    return re.sub(r"/\d+(?=/|$)", "/{number}", urlparse(request_url).path)
+
+
+def _retry_after(response):
+    """
+    Reads the delay GitHub asks for from the Retry-After header of a response
+    :param response: requests.Response
+    :return: Delay in seconds or None if the header is missing
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    if value.strip().isdigit():
+        return int(value)
+    # The header may also contain an http date instead of seconds
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+# ------------------------------ CONCURRENT COLLECTION ------------------------------ #
+
+
+def _ignore_progress(position):
+    """
+    Replaces the function storing the progress in the checkpoint if the collection is not checkpointed
+    :param position: Number of finished items or pages
+    :return:
+    """
+    return
+
+
 # ------------------------------ WRITE INSTANTLY TO CSV TO SAVE RAM ------------------------------ #
 
 
-def _initialize_csv(file):
+_LOG_COLUMNS = ['issue:number', 'issue:type', 'timestamp', 'author:name', 'author:id', 'author:association',
+                'message', 'commit:hash', 'activity']
+
+
+def _last_page(response):
+    """
+    Reads the number of the last page from the Link header of a response
+    :param response: requests.Response of a paginated end point
+    :return: Number of the last page or None if it is unknown
+    """
+    last_url = response.links.get("last", {}).get("url")
+    if last_url is None:
+        return None
+    page = parse_qs(urlparse(last_url).query).get("page")
+    return int(page[0]) if page else None
+
+
+def _has_next_page(response, items, per_page):
+    """
+    Whether there is a page after the page of a response
+    :param response: requests.Response of a paginated end point
+    :param items: json list of the response
+    :param per_page: Number of items per page
+    :return: Boolean
+    """
+    if "Link" in response.headers:
+        return "next" in response.links
+    # Without a Link header, e.g. for cached responses, only a full page can be followed by another one
+    return len(items) >= per_page
+
+
+def _initialize_csv(file, chunk_size=1000, append=False):
     """
     Creates an empty csv file with column names to write the GitHubRepo information into.
     :param file: File name of the csv file to be created
+    :param chunk_size: Number of rows that are buffered before they are written to the file
+    :param append: If True, the rows are appended to the existing file instead
+    :return: BufferedCSVWriter that keeps the order of the columns always the same
+    """
+    return BufferedCSVWriter(file, _LOG_COLUMNS, chunk_size=chunk_size, append=append)
+
+
+def _read_pages(file):
+    """
+    Reads the pages of the issue list that were stored by a checkpointed collection
+    :param file: Name of the file containing one json list per line
+    :return: Generator of the pages
+    """
+    with open(file, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _project_user(user):
+    """
+    Reduces a user of a response to the fields that are used to build the logs
+    :param user: Dictionary of the user or None for deleted users
+    :return: Dictionary with the login and id of the user or None
+    """
+    return {"login": user["login"], "id": user["id"]} if user is not None else None
+
+
+def _project_issue(item):
+    """
+    Reduces an issue or pull request of the /issues end point to the fields that are used to build the logs. The
+    reactions and the many URLs and nested objects of the items are dropped, which takes a fraction of the memory.
+    Projecting an already projected item returns an equal item
+    :param item: Dictionary of the issue or pull request
+    :return: Dictionary with the used fields, pull requests keep the key pull_request
+    """
+    projected = {"number": item["number"], "title": item["title"],
+                 "labels": [{"name": label["name"]} for label in item["labels"]],
+                 "created_at": item["created_at"], "closed_at": item["closed_at"], "state": item["state"],
+                 "user": _project_user(item["user"]), "author_association": item["author_association"],
+                 "assignees": [_project_user(assignee) for assignee in item["assignees"]], "body": item["body"]}
+    if "pull_request" in item:
+        projected["pull_request"] = True
+    return projected
+
+
+def _split_issues_and_prs(json_list, issue_list, pr_list):
+    """
+    Projects the items of a page of the /issues end point and appends them to the issues or the pull requests
+    :param json_list: List of the issues and pull requests of the page
+    :param issue_list: List the issues are appended to
+    :param pr_list: List the pull requests are appended to
+    :return: List of the projected items of the page
+    """
+    projected_list = [_project_issue(item) for item in json_list]
+    for item in projected_list:
+        (pr_list if "pull_request" in item else issue_list).append(item)
+    return projected_list
+
+
+class _SpilledItems(Sequence):
+    """
+    Sequence of issues or pull requests that are stored in a temporary json lines file instead of the memory, only the
+    offsets of the lines are kept in memory. Iterating reads the file sequentially
+    """
+
+    def __init__(self, directory):
+        """
+        Constructor, creates the temporary file
+        :param directory: Directory to create the file in
+        """
+        handle, self.file = tempfile.mkstemp(suffix=".jsonl", dir=directory)
+        self._handle = os.fdopen(handle, "wb")
+        self._offsets = array("q")
+
+    def append(self, item):
+        """
+        Appends an item to the file
+        :param item: Dictionary of the issue or pull request
+        :return:
+        """
+        self._offsets.append(self._handle.tell())
+        self._handle.write(json.dumps(item).encode("utf-8") + b"\n")
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        self._handle.flush()
+        with open(self.file, "rb") as f:
+            f.seek(self._offsets[index])
+            return json.loads(f.readline())
+
+    def __iter__(self):
+        self._handle.flush()
+        with open(self.file, "rb") as f:
+            for line in islice(f, len(self._offsets)):
+                yield json.loads(line)
+
+    def close(self):
+        """
+        Deletes the temporary file
+        :return:
+        """
+        if not self._handle.closed:
+            self._handle.close()
+            os.remove(self.file)
+
+
+class _MergingLogWriter(BufferedCSVWriter):
+    """
+    Writes the rows of updated issues into a part file next to an existing log and merges them into the log once it
+    is closed. The rows of the updated issues in the existing log are replaced, the other rows are kept in their order.
+    """
+
+    def __init__(self, file, issue_numbers, chunk_size=1000):
+        """
+        Constructor
+        :param file: Name of the existing csv file of the log
+        :param issue_numbers: Set of the numbers of the updated issues and pull requests as strings
+        :param chunk_size: Number of rows that are buffered before they are written to the file
+        """
+        self.log_file = file
+        self.issue_numbers = issue_numbers
+        part_file = file + ".sync"
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        super().__init__(part_file, _LOG_COLUMNS, chunk_size=chunk_size, append=True)
+
+    def close(self):
+        """
+        Writes the remaining buffered rows and merges them into the log
+        :return:
+        """
+        if not self._handle.closed:
+            super().close()
+            _merge_log(self.log_file, self.file, self.issue_numbers, self.chunk_size)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # The existing log stays untouched if the collection crashed
+            super().close()
+            return False
+        self.close()
+        return False
+
+
+def _merge_log(file, part_file, issue_numbers, chunk_size=1000):
+    """
+    Replaces the rows of the given issues in a log by the rows of a part file without header
+    :param file: Name of the csv file of the log
+    :param part_file: Name of the csv file containing the new rows of the issues
+    :param issue_numbers: Set of the numbers of the issues as strings
+    :param chunk_size: Number of rows that are buffered before they are written to the file
     :return:
     """
-    df = pd.DataFrame(columns=['issue:number', 'issue:type', 'timestamp', 'author:name', 'author:id',
-                               'author:association', 'message', 'commit:hash', 'activity'])
-    df.to_csv(file, index=False)
-    return
+    merged_file = file + ".merge"
+    with open(file, newline="", encoding="utf-8") as f, _initialize_csv(merged_file, chunk_size) as writer:
+        reader = csv.reader(f)
+        header = next(reader)
+        if header != _LOG_COLUMNS:
+            raise ValueError(f"The columns of {file} do not match the columns of the log")
+        number_index = header.index("issue:number")
+        for row in reader:
+            if row[number_index] not in issue_numbers:
+                writer.write_row(dict(zip(header, row)))
+        writer.write_file(part_file)
+    os.replace(merged_file, file)
+    os.remove(part_file)
+
+
+# ------------------------------ STATE OF INCREMENTAL RUNS ------------------------------ #
 
+# Overlap of two incremental runs
+_SYNC_OVERLAP = timedelta(minutes=5)
 
-def _append_to_csv(df, file):
+
+def _read_sync_state(state_file, files):
+    """
+    Reads the time of the last run of GitHubRepo.build_logs
+    :param state_file: Name of the state file
+    :param files: Names of the log files that have to exist to update them incrementally
+    :return: ISO 8601 timestamp or None if there is no complete previous run
+    """
+    if not os.path.exists(state_file) or not all(os.path.exists(file) for file in files):
+        return None
+    with open(state_file, encoding="utf-8") as f:
+        return json.load(f)["last_sync"]
+
+
+def _write_sync_state(state_file, sync_time):
     """
-    Appends information to the csv file that was created by the _initialize_csv method
-    :param df: DataFrame containing information that shall be appended
-    :param file: File name of the csv file that was created by _initialize_csv to write the information in
+    Stores the time of the current run. The file is replaced atomically so that an interrupted run never leaves a
+    broken state file behind
+    :param state_file: Name of the state file
+    :param sync_time: ISO 8601 timestamp
     :return:
     """
-    # Ensure that the order of columns is always the same
-    df[['issue:number', 'issue:type', 'timestamp', 'author:name', 'author:id', 'author:association', 'message',
-        'commit:hash', 'activity']].to_csv(file, mode='a', header=False, index=False)
-    return
+    temporary_file = state_file + ".tmp"
+    with open(temporary_file, "w", encoding="utf-8") as f:
+        json.dump({"last_sync": sync_time}, f)
+    os.replace(temporary_file, state_file)
 
 
 # -------------------------- Methods to format the API responses -------------------------- #
@@ -597,13 +1607,26 @@ def _format_issue_comment_response(comment_list, issue_type):
     for comment in comment_list:
         comment_dict = {"issue:number": comment["html_url"].split("/")[-1].split("#")[0],
                         "issue:type": issue_type.value, "timestamp": comment["created_at"],
-                        "author:name": comment["user"]["login"], "author:id": comment["user"]["id"],
+                        "author:name": comment["user"]["login"] if comment["user"] is not None else "No author",
+                        "author:id": comment["user"]["id"] if comment["user"] is not None else "No author",
                         "author:association": comment["author_association"], "message": comment["body"],
                         "commit:hash": "No commit hash", "activity": "commented"}
         parsed_comments.append(comment_dict)
     return parsed_comments
 
 
+def _opened_pull_request_row(pr):
+    """
+    Creates the row of the creation comment of a pull request, its body is not returned by the comment end points
+    :param pr: Dictionary of the pull request
+    :return: Dictionary containing the information of the creation comment
+    """
+    return {"issue:number": pr["number"], "issue:type": IssueType.PULL_REQUEST.value, "timestamp": pr["created_at"],
+            "author:name": pr["user"]["login"], "author:id": pr["user"]["id"],
+            "author:association": pr["author_association"], "message": pr["body"], "commit:hash": "No commit hash",
+            "activity": "opened pull request"}
+
+
 def _format_pr_review_response(reviewlist):
     """
     Formats the response from GitHubRepo.__send_request for access of the end point for reviews
@@ -675,6 +1698,67 @@ def _format_event_response(event_list, issue_number, issue_type):
     return result
 
 
+# Activities of the rows of the timeline that belong to the comment log, all others belong to the event log
+_TIMELINE_COMMENT_ACTIVITIES = ["commented", "reviewed", "commented on review"]
+
+# Items of the timeline that are not returned by the events end point
+_TIMELINE_ONLY_EVENTS = ["commented", "reviewed", "line-commented", "commit-commented", "committed",
+                         "cross-referenced"]
+
+
+def _format_timeline_response(item_list, pr_number):
+    """
+    Formats the response of the timeline end point of a pull request with the format functions of the end points
+    that return the same items
+    :param item_list: List of the timeline items of a page of the end point
+    :param pr_number: Number of the considered pull request
+    :return: List of dictionaries containing information about each comment, review, review comment and event
+    """
+    # Endpoint: /issues/{issue_number}/timeline
+    result = []
+    for item in item_list:
+        if item["event"] == "commented":
+            result.extend(_format_issue_comment_response([item], IssueType.PULL_REQUEST))
+        elif item["event"] == "reviewed":
+            result.extend(_format_pr_review_response([item]))
+        elif item["event"] == "line-commented":
+            result.extend(_format_pr_reviewcomment_response(item["comments"]))
+        elif item["event"] not in _TIMELINE_ONLY_EVENTS:
+            result.extend(_format_event_response([item], issue_number=pr_number,
+                                                 issue_type=IssueType.PULL_REQUEST.value))
+    return result
+
+
+def _format_repository_comment_response(comment_list, issue_numbers, issue_type):
+    """
+    Formats the response of the repository wide end point for issue comments, keeping the comments of the given issues
+    :param comment_list: List of the comments of a page of the end point
+    :param issue_numbers: Set of the numbers of the issues whose comments are kept
+    :param issue_type: Type of the considered issues, either pull request or issue
+    :return: List of dictionaries containing information of each comment, see _format_issue_comment_response
+    """
+    # Endpoint: /issues/comments
+    comments = [comment for comment in comment_list if int(comment["issue_url"].split("/")[-1]) in issue_numbers]
+    return _format_issue_comment_response(comments, issue_type)
+
+
+def _format_repository_event_response(event_list, issue_numbers, issue_type):
+    """
+    Formats the response of the repository wide end point for events, keeping the events of the given issues
+    :param event_list: List of the events of a page of the end point
+    :param issue_numbers: Set of the numbers of the issues whose events are kept
+    :param issue_type: Type of the considered issues, either pull request or issue
+    :return: List of dictionaries containing information about each event, see _format_event_response
+    """
+    # Endpoint: /issues/events
+    result = []
+    for event in event_list:
+        issue_number = event["issue"]["number"] if event.get("issue") is not None else None
+        if issue_number in issue_numbers:
+            result.extend(_format_event_response([event], issue_number=issue_number, issue_type=issue_type))
+    return result
+
+
 def _combine_comments_and_events(comment_df, event_df):
     """
     Combines the comment and event log for issues and formats them such that they are sorted by issue number and
@@ -689,7 +1773,11 @@ def _combine_comments_and_events(comment_df, event_df):
 
 
 class APIResponseError(Exception):
-    pass
+
+    def __init__(self, *args, status_code=None):
+        super().__init__(*args)
+        # Status code of the response that caused the error, if there was one
+        self.status_code = status_code
 
 
 class IssueType(Enum):
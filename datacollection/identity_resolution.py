@@ -0,0 +1,104 @@
+import re
+
+# GitHub's noreply addresses, either <login>@users.noreply.github.com or <id>+<login>@users.noreply.github.com
+_NOREPLY_PATTERN = re.compile(r'^(?:[0-9]+\+)?([A-Za-z0-9](?:[A-Za-z0-9-]*[A-Za-z0-9])?)@users\.noreply\.github\.com$',
+                              re.IGNORECASE)
+
+# Entries of a .mailmap file, "Proper Name <proper@mail> Commit Name <commit@mail>" where all but one mail are optional
+_MAILMAP_PATTERN = re.compile(r'^\s*([^<]*?)\s*<([^>]*)>\s*(?:([^<]*?)\s*<([^>]*)>)?\s*$')
+
+
+def parse_noreply_mail(mail):
+    """
+    Extracts the GitHub user name of a noreply mail address
+    :param mail: Mail address
+    :return: GitHub user name in lower case or None if the address is no noreply address of GitHub
+    """
+    if not isinstance(mail, str):
+        return None
+    match = _NOREPLY_PATTERN.match(mail.strip())
+    return match.group(1).lower() if match is not None else None
+
+
+def read_mailmap(file):
+    """
+    Reads the mail addresses of a .mailmap file, see https://git-scm.com/docs/gitmailmap
+    :param file: Path to the .mailmap file
+    :return: List of tuples (proper mail, commit mail) where the commit mail is None if the entry only sets the name
+    """
+    entries = []
+    with open(file, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            match = _MAILMAP_PATTERN.match(line)
+            if match is None:
+                continue
+            proper_mail, commit_mail = match.group(2), match.group(4)
+            entries.append((proper_mail or None, commit_mail or None))
+    return entries
+
+
+class IdentityResolver:
+    """
+    The class IdentityResolver maps GitHub user names to mail addresses without using the API. It uses the noreply
+    addresses of GitHub (<id>+<login>@users.noreply.github.com) that are used in the commits of a git log and the mail
+    addresses that a .mailmap file groups together with such a noreply address.
+    """
+
+    def __init__(self, git_log=None, mailmap=None,
+                 mail_columns=("commit:author:mail", "commit:committer:mail")):
+        """
+        Constructor
+        :param git_log: Optional DataFrame of a commit log generated by git_information.GitRepo.get_commit_information
+        :param mailmap: Optional path to a .mailmap file of the repository
+        :param mail_columns: Columns of the git log containing mail addresses
+        """
+        commit_mails = set()
+        if git_log is not None:
+            for column in mail_columns:
+                commit_mails.update(mail for mail in git_log[column].dropna().unique())
+        self.mapping = {}
+        # Noreply addresses used in commits belong to exactly one user and match the commits of this user
+        for mail in sorted(commit_mails):
+            login = parse_noreply_mail(mail)
+            if login is not None:
+                self.mapping.setdefault(login, mail)
+        if mailmap is not None:
+            lowered_commit_mails = {mail.lower(): mail for mail in commit_mails}
+            for login, mails in _group_mailmap(read_mailmap(mailmap)).items():
+                if login in self.mapping:
+                    continue
+                # A mail of the group that is used in the commits is preferred over the canonical mail
+                used = [lowered_commit_mails[mail.lower()] for mail in mails if mail.lower() in lowered_commit_mails]
+                self.mapping[login] = used[0] if used else mails[0]
+
+    def resolve(self, login):
+        """
+        Returns the mail address of a GitHub user if it is known locally
+        :param login: GitHub user name
+        :return: Mail address or None if it is unknown
+        """
+        if not isinstance(login, str):
+            return None
+        return self.mapping.get(login.lower())
+
+
+def _group_mailmap(entries):
+    """
+    Groups the mail addresses of the .mailmap entries by the GitHub user of the noreply addresses among them
+    :param entries: List of tuples (proper mail, commit mail) of read_mailmap
+    :return: Dictionary mapping the GitHub user names to the mails of their group, the canonical mail first and
+    noreply addresses last
+    """
+    groups = {}
+    for proper_mail, commit_mail in entries:
+        mails = [mail for mail in (proper_mail, commit_mail) if mail is not None]
+        group = groups.setdefault(proper_mail.lower() if proper_mail else commit_mail.lower(), [])
+        group.extend(mail for mail in mails if mail not in group)
+    result = {}
+    for mails in groups.values():
+        for mail in mails:
+            login = parse_noreply_mail(mail)
+            if login is not None and login not in result:
+                result[login] = sorted(mails, key=lambda m: parse_noreply_mail(m) is not None)
+    return result
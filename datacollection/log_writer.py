@@ -0,0 +1,297 @@
+import csv
+import math
+import os
+import shutil
+from datetime import datetime
+
+# Output formats of the logs, csv files keep all values as strings while parquet and feather files have typed columns
+OUTPUT_FORMATS = ["csv", "parquet", "feather"]
+
+
+class BufferedCSVWriter:
+    """
+    The class BufferedCSVWriter writes the rows of a log into a csv file. The rows are buffered as plain lists and only
+    written to the file in chunks, which is a lot cheaper than creating a DataFrame and opening the file for every row.
+    The values are rendered in the same way as pandas.DataFrame.to_csv renders them, such that the files are identical
+    to the ones written row by row with pandas.
+    """
+
+    def __init__(self, file, columns, chunk_size=1000, append=False):
+        """
+        Constructor, creates the file with the column names as header unless it is appended to an existing file
+        :param file: Name of the csv file to write the rows in
+        :param columns: List of the column names in the order they are written in
+        :param chunk_size: Number of buffered rows after which they are written to the file
+        :param append: If True, the rows are appended to an existing file without writing the header again
+        """
+        self.file = file
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self.bytes_written = 0
+        self._buffer = []
+        # pandas opens the file in the same way and terminates the lines with os.linesep
+        self._handle = open(file, mode='a' if append else 'w', newline="", encoding="utf-8")
+        self._initial_size = os.fstat(self._handle.fileno()).st_size
+        self._writer = csv.writer(self._handle, lineterminator=os.linesep)
+        if not append:
+            self._writer.writerow(self.columns)
+            self._handle.flush()
+
+    def write_row(self, row):
+        """
+        Buffers a single row and writes the buffer to the file once it holds chunk_size rows
+        :param row: Dictionary containing a value for each of the columns
+        :return:
+        """
+        self._buffer.append([_format_value(row[column]) for column in self.columns])
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        """
+        Buffers multiple rows, see write_row
+        :param rows: List of dictionaries containing a value for each of the columns
+        :return:
+        """
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        """
+        Writes all buffered rows to the file
+        :return:
+        """
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+        self._handle.flush()
+        self.bytes_written = os.fstat(self._handle.fileno()).st_size - self._initial_size
+
+    def write_file(self, file):
+        """
+        Appends the rows of another csv file without header, e.g. a part of the log that was written by another process
+        :param file: Name of the csv file to append
+        :return:
+        """
+        self.flush()
+        with open(file, newline="", encoding="utf-8") as f:
+            shutil.copyfileobj(f, self._handle)
+        self.flush()
+
+    def close(self):
+        """
+        Writes the remaining buffered rows and closes the file
+        :return:
+        """
+        if not self._handle.closed:
+            self.flush()
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The buffered rows are also written if the collection crashed, so that nothing that was collected is lost
+        self.close()
+        return False
+
+
+def _format_value(value):
+    """
+    Renders a value as string in the same way as pandas.DataFrame.to_csv does
+    :param value: Value of a single cell
+    :return: String that is written into the csv file
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+class BufferedArrowWriter:
+    """
+    The class BufferedArrowWriter writes the rows of a log into a Parquet or Feather file with typed columns. Datetimes
+    are stored as int64 seconds since epoch, so that the file can be loaded without parsing any values. The rows are
+    buffered as plain lists per column and written as one row group or record batch per chunk. pyarrow is only
+    needed if this writer is used.
+    """
+
+    def __init__(self, file, columns, types, chunk_size=1000, output_format="parquet"):
+        """
+        Constructor, creates the file
+        :param file: Name of the file to write the rows in
+        :param columns: List of the column names in the order they are written in
+        :param types: Dictionary mapping each column to its type, one of "string", "int64", "bool" and "int64_list"
+        :param chunk_size: Number of buffered rows after which they are written to the file
+        :param output_format: Either "parquet" or "feather"
+        """
+        pa = _import_pyarrow()
+        self.file = file
+        self.columns = list(columns)
+        self.types = [types[column] for column in self.columns]
+        self.chunk_size = chunk_size
+        self.output_format = output_format
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.schema = pa.schema([(column, _arrow_type(pa, type_name)) for column, type_name in zip(self.columns,
+                                                                                                   self.types)])
+        self._buffer = [[] for _ in self.columns]
+        if output_format == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(file, self.schema)
+        elif output_format == "feather":
+            self._writer = pa.ipc.new_file(file, self.schema, options=pa.ipc.IpcWriteOptions(compression="lz4"))
+        else:
+            raise ValueError(f"Unknown output format {output_format}, expected parquet or feather")
+        self._closed = False
+
+    def write_row(self, row):
+        """
+        Buffers a single row and writes the buffer to the file once it holds chunk_size rows
+        :param row: Dictionary containing a value for each of the columns
+        :return:
+        """
+        for values, column, type_name in zip(self._buffer, self.columns, self.types):
+            values.append(_typed_value(row[column], type_name))
+        if len(self._buffer[0]) >= self.chunk_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        """
+        Buffers multiple rows, see write_row
+        :param rows: List of dictionaries containing a value for each of the columns
+        :return:
+        """
+        for row in rows:
+            self.write_row(row)
+
+    def flush(self):
+        """
+        Writes all buffered rows to the file
+        :return:
+        """
+        if self._buffer[0]:
+            pa = _import_pyarrow()
+            batch = pa.record_batch([pa.array(values, type=field.type)
+                                     for values, field in zip(self._buffer, self.schema)], schema=self.schema)
+            self._write_batch(batch)
+            self._buffer = [[] for _ in self.columns]
+
+    def write_file(self, file):
+        """
+        Appends the rows of another file of the same format and columns, e.g. a part of the log that was written by
+        another process
+        :param file: Name of the file to append
+        :return:
+        """
+        self.flush()
+        pa = _import_pyarrow()
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file).iter_batches(batch_size=max(1, self.chunk_size)):
+                self._write_batch(batch)
+        else:
+            with pa.memory_map(file) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    self._write_batch(reader.get_batch(i))
+
+    def _write_batch(self, batch):
+        """
+        Writes a record batch to the file
+        :param batch: pyarrow.RecordBatch with the schema of the file
+        :return:
+        """
+        if batch.num_rows == 0:
+            return
+        if self.output_format == "parquet":
+            pa = _import_pyarrow()
+            self._writer.write_table(pa.Table.from_batches([batch], schema=self.schema))
+        else:
+            self._writer.write_batch(batch)
+        self.rows_written += batch.num_rows
+        # The writers of pyarrow buffer a part of the output, so this is the size that has reached the file so far
+        self.bytes_written = os.path.getsize(self.file)
+
+    def close(self):
+        """
+        Writes the remaining buffered rows and closes the file, only closed files can be read
+        :return:
+        """
+        if not self._closed:
+            self.flush()
+            self._writer.close()
+            self._closed = True
+            self.bytes_written = os.path.getsize(self.file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # The buffered rows are also written if the collection crashed, so that the file is complete and readable
+        self.close()
+        return False
+
+
+def open_log_writer(file, columns, types, output_format="csv", chunk_size=1000, append=False):
+    """
+    Creates the buffered writer of a log for the given output format
+    :param file: Name of the file to write the rows in
+    :param columns: List of the column names in the order they are written in
+    :param types: Dictionary mapping each column to its type, only used for typed output formats
+    :param output_format: One of OUTPUT_FORMATS
+    :param chunk_size: Number of buffered rows after which they are written to the file
+    :param append: If True, the rows are appended to an existing file, only possible for csv files
+    :return: BufferedCSVWriter or BufferedArrowWriter
+    """
+    if output_format == "csv":
+        return BufferedCSVWriter(file, columns, chunk_size=chunk_size, append=append)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {output_format}, expected one of {OUTPUT_FORMATS}")
+    if append:
+        raise ValueError(f"Rows can not be appended to an existing {output_format} file")
+    return BufferedArrowWriter(file, columns, types, chunk_size=chunk_size, output_format=output_format)
+
+
+def _import_pyarrow():
+    """
+    Imports pyarrow, which is only needed for the typed output formats
+    :return: pyarrow module
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("The parquet and feather output formats require pyarrow to be installed") from e
+    return pyarrow
+
+
+def _arrow_type(pa, type_name):
+    """
+    Maps the type names of the log columns to pyarrow types
+    :param pa: pyarrow module
+    :param type_name: One of "string", "int64", "bool" and "int64_list"
+    :return: pyarrow.DataType
+    """
+    return {"string": pa.string(),
+            "int64": pa.int64(),
+            "bool": pa.bool_(),
+            "int64_list": pa.list_(pa.int64())}[type_name]
+
+
+def _typed_value(value, type_name):
+    """
+    Converts a value into the representation of the column type of the typed output formats
+    :param value: Value of a single cell
+    :param type_name: Type of the column
+    :return: Value that can be stored in a column of the pyarrow type
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if type_name == "string":
+        return str(value)
+    if type_name == "int64" and isinstance(value, datetime):
+        return int(value.timestamp())
+    if type_name == "int64_list":
+        return list(value)
+    return value
@@ -0,0 +1,121 @@
+import queue
+import threading
+
+# Marks the end of the items in a queue of the pipeline
+_DONE = object()
+# Interval in seconds in which blocked workers check whether the pipeline was stopped
+_POLL_INTERVAL = 0.1
+
+
+def run_pipeline(items, fetch, format_rows, write, fetch_workers=1, format_workers=1, queue_size=4):
+    """
+    Collects the items in a pipeline of three stages that run at the same time: fetch_workers threads request the
+    items, format_workers threads format the responses into log rows, and the calling thread writes the rows in the
+    order of the items. So the next items are requested while the previous ones are formatted and written. The stages
+    are connected by queues of queue_size entries, a stage that is ahead waits until the next stage caught up, and no
+    item is requested while too many items wait to be written, e.g. behind an item with many pages. So the number of
+    items in memory stays bounded however long the collection runs.
+    If a stage raises an exception, the pipeline is stopped and the exception is raised again by run_pipeline. The
+    items that were written before are complete, so the progress of a checkpoint stays valid
+    :param items: Iterable of the items, e.g. issues or the pages of a generator, it is advanced by one thread at a time
+    :param fetch: Function that requests a single item and returns its response, e.g. a json list
+    :param format_rows: Function that formats an item and its response into the value passed to write
+    :param write: Function that writes the formatted value of an item, e.g. BufferedCSVWriter.write_rows
+    :param fetch_workers: Number of items that are requested at the same time
+    :param format_workers: Number of responses that are formatted at the same time
+    :param queue_size: Maximum number of items that wait between two stages
+    :return:
+    """
+    fetched = queue.Queue(maxsize=queue_size)
+    formatted = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    source = enumerate(items)
+    source_lock = threading.Lock()
+    running_fetchers = [fetch_workers]
+    # Items that were taken from the source but are not written yet
+    window = threading.Semaphore(fetch_workers + format_workers + 2 * queue_size)
+
+    def put(target, value):
+        # Waits for space in the queue, unless the pipeline was stopped in the meantime
+        while not stop.is_set():
+            try:
+                target.put(value, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(source_queue):
+        while not stop.is_set():
+            try:
+                return source_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def fail(exception):
+        errors.append(exception)
+        stop.set()
+
+    def fetcher():
+        try:
+            while not stop.is_set():
+                if not window.acquire(timeout=_POLL_INTERVAL):
+                    continue
+                with source_lock:
+                    next_item = next(source, None)
+                if next_item is None:
+                    break
+                index, item = next_item
+                if not put(fetched, (index, item, fetch(item))):
+                    return
+            with source_lock:
+                running_fetchers[0] -= 1
+                last = running_fetchers[0] == 0
+            if last:
+                # The last fetcher tells each formatter that no more responses follow
+                for _ in range(format_workers):
+                    put(fetched, _DONE)
+        except BaseException as e:
+            fail(e)
+
+    def formatter():
+        try:
+            while True:
+                entry = get(fetched)
+                if entry is _DONE:
+                    put(formatted, _DONE)
+                    return
+                index, item, response = entry
+                if not put(formatted, (index, format_rows(item, response))):
+                    return
+        except BaseException as e:
+            fail(e)
+
+    threads = ([threading.Thread(target=fetcher, daemon=True) for _ in range(fetch_workers)] +
+               [threading.Thread(target=formatter, daemon=True) for _ in range(format_workers)])
+    for thread in threads:
+        thread.start()
+    try:
+        # The formatted items arrive out of order with several workers, they wait until the previous ones are written
+        pending = {}
+        next_index = 0
+        finished_formatters = 0
+        while finished_formatters < format_workers:
+            entry = get(formatted)
+            if errors:
+                raise errors[0]
+            if entry is _DONE:
+                finished_formatters += 1
+                continue
+            index, rows = entry
+            pending[index] = rows
+            while next_index in pending:
+                write(pending.pop(next_index))
+                window.release()
+                next_index += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
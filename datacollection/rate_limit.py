@@ -0,0 +1,103 @@
+import threading
+import time
+from datetime import datetime
+
+# Seconds after the reset of the rate limit until a token whose requests were denied is used again, so that a reset
+# that already passed on the local clock but not on the one of GitHub does not let the requests be sent right away
+_DENIED_MARGIN = 60
+
+
+class TokenScheduler:
+    """
+    The class TokenScheduler distributes the requests to GitHub's API over a pool of authtokens. It tracks the
+    remaining requests of each token from the X-RateLimit headers of the responses, routes each request to the token
+    with the most remaining requests and only waits for the reset of the rate limit once all tokens are down to the
+    reserve, instead of waiting after a request was denied.
+    GitHub counts the requests of the REST API ("core") and of the GraphQL API ("graphql") in separate rate limits,
+    named by the X-RateLimit-Resource header, so the remaining requests are tracked per token and resource.
+    """
+
+    def __init__(self, tokens, reserve=10):
+        """
+        Constructor
+        :param tokens: List of authtokens for GitHub API access
+        :param reserve: Number of requests per token that are not used, so that concurrent requests do not exceed the
+        rate limit
+        """
+        if not tokens:
+            raise ValueError("At least one authtoken is needed")
+        self.tokens = list(tokens)
+        self.reserve = reserve
+        # The remaining requests of a (token, resource) are unknown until the first response, they are missing then
+        self._remaining = {}
+        self._reset = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, resource="core"):
+        """
+        Selects the token for the next request, waits for the reset of the rate limit if all tokens are down to the
+        reserve
+        :param resource: Rate limit the request counts against, e.g. "core" or "graphql"
+        :return: Authtoken
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                keys = [(token, resource) for token in self.tokens]
+                for key in keys:
+                    if self._reset.get(key, 0) and self._reset[key] <= now:
+                        del self._remaining[key]
+                        del self._reset[key]
+                key = max(keys, key=lambda k: self._remaining.get(k, float("inf")))
+                if key not in self._remaining or self._remaining[key] > self.reserve:
+                    if key in self._remaining:
+                        self._remaining[key] -= 1
+                    return key[0]
+                release_time = min(self._reset[key] for key in keys)
+            print("Request limit of all tokens reached. Waiting until ", datetime.fromtimestamp(release_time),
+                  " to continue. Remaining time: ", int(release_time - now) + 1, "seconds")
+            time.sleep(max(release_time - now, 0) + 1)
+
+    def update(self, token, headers, resource="core"):
+        """
+        Updates the remaining requests of a token from the headers of a response
+        :param token: Authtoken the request was sent with
+        :param headers: Headers of the response
+        :param resource: Rate limit the request was acquired for, used if the response names no X-RateLimit-Resource
+        :return:
+        """
+        if "X-RateLimit-Remaining" not in headers or "X-RateLimit-Reset" not in headers:
+            return
+        remaining = int(headers["X-RateLimit-Remaining"])
+        reset = int(headers["X-RateLimit-Reset"])
+        key = (token, headers.get("X-RateLimit-Resource", resource))
+        with self._lock:
+            # Responses of concurrent requests arrive in any order, within the same window the lowest count is current
+            if key in self._remaining and reset == self._reset[key]:
+                remaining = min(remaining, self._remaining[key])
+            self._remaining[key] = remaining
+            self._reset[key] = reset
+
+    def deny(self, token, headers, resource="core"):
+        """
+        Records that a request of a token was denied because its rate limit is used up. The token is not used again
+        until _DENIED_MARGIN seconds after the reset, or after now if the reset already passed on the local clock
+        :param token: Authtoken the request was sent with
+        :param headers: Headers of the denied response
+        :param resource: Rate limit the request was acquired for, used if the response names no X-RateLimit-Resource
+        :return:
+        """
+        reset = int(headers.get("X-RateLimit-Reset", 0))
+        key = (token, headers.get("X-RateLimit-Resource", resource))
+        with self._lock:
+            self._remaining[key] = 0
+            self._reset[key] = max(reset, time.time()) + _DENIED_MARGIN
+
+    def remaining(self, resource="core"):
+        """
+        Getter for the known remaining requests of all tokens
+        :param resource: Rate limit, e.g. "core" or "graphql"
+        :return: Dictionary mapping the index of each token to its remaining requests or None if unknown
+        """
+        with self._lock:
+            return {index: self._remaining.get((token, resource)) for index, token in enumerate(self.tokens)}
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+
+from datacollection.response_cache import _cache_key
+
+
+class ResponseArchive:
+    """
+    The class ResponseArchive keeps the raw body of every response of a collection, so that the logs can be built
+    again from the archive without any request, e.g. after a formatting function changed. The bodies are stored gzip
+    compressed in files named after their sha256 hash, so identical bodies like the empty pages of thousands of issues
+    are only stored once. A sqlite index maps each request, given by its URL and parameters, to the hash of its body
+    and the Link header that is needed for the pagination.
+    """
+
+    def __init__(self, directory, replay=False):
+        """
+        Constructor, creates the archive if it does not exist yet
+        :param directory: Directory of the archive
+        :param replay: If True, the archive is only read and has to exist
+        """
+        index_file = os.path.join(directory, "index.sqlite")
+        if replay and not os.path.exists(index_file):
+            raise FileNotFoundError(f"No response archive found in {directory}")
+        self.directory = directory
+        self.replay = replay
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        # The archive is shared by concurrent requests, so all accesses of the connection are serialized
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(index_file, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, hash TEXT, "
+                                     "link TEXT)")
+
+    def get(self, url, params):
+        """
+        Looks up the archived response of a request
+        :param url: URL of the request
+        :param params: Parameters of the request
+        :return: Tuple (body as bytes, Link header or None) or None if the request is not archived
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT hash, link FROM responses WHERE key = ?",
+                                           (_cache_key(url, params),)).fetchone()
+        if row is None:
+            return None
+        with gzip.open(self.__object_file(row[0]), "rb") as f:
+            return f.read(), row[1]
+
+    def put(self, url, params, body, link=None):
+        """
+        Archives the response of a request, replacing the previously archived response of the request
+        :param url: URL of the request
+        :param params: Parameters of the request
+        :param body: Body of the response as bytes
+        :param link: Value of the Link header or None
+        :return:
+        """
+        content_hash = hashlib.sha256(body).hexdigest()
+        object_file = self.__object_file(content_hash)
+        if not os.path.exists(object_file):
+            os.makedirs(os.path.dirname(object_file), exist_ok=True)
+            # Written to a temporary file first, so that a crash never leaves a truncated body behind
+            temporary_file = f"{object_file}.{threading.get_ident()}.tmp"
+            with gzip.open(temporary_file, "wb") as f:
+                f.write(body)
+            os.replace(temporary_file, object_file)
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                                     (_cache_key(url, params), content_hash, link))
+
+    def close(self):
+        """
+        Closes the index
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __object_file(self, content_hash):
+        """
+        Path of the file of a body, the files are spread over subdirectories named after the first two characters
+        :param content_hash: sha256 hash of the body
+        :return: Path of the gzip file
+        """
+        return os.path.join(self.directory, "objects", content_hash[:2], content_hash[2:] + ".json.gz")
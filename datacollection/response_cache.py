@@ -0,0 +1,69 @@
+import json
+import sqlite3
+import threading
+
+
+class ResponseCache:
+    """
+    The class ResponseCache stores the ETag and Last-Modified values and the bodies of API responses in a sqlite
+    database on disk. The stored values are sent with the next request of the same URL and parameters, GitHub answers
+    with 304 Not Modified if nothing changed, which does not count against the rate limit, and the stored body is used.
+    """
+
+    def __init__(self, file):
+        """
+        Constructor, creates the database if it does not exist yet
+        :param file: Name of the sqlite database file
+        """
+        self.file = file
+        self.hits = 0
+        # The cache is shared by concurrent requests, so all accesses of the connection are serialized
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, etag TEXT, "
+                                     "last_modified TEXT, body BLOB)")
+
+    def get(self, url, params):
+        """
+        Looks up the stored response of a request
+        :param url: URL of the request
+        :param params: Parameters of the request
+        :return: Tuple (etag, last modified, body) or None if no response is stored
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT etag, last_modified, body FROM responses WHERE key = ?",
+                                           (_cache_key(url, params),)).fetchone()
+        return row
+
+    def put(self, url, params, etag, last_modified, body):
+        """
+        Stores a response, replacing the previously stored response of the request
+        :param url: URL of the request
+        :param params: Parameters of the request
+        :param etag: Value of the ETag header or None
+        :param last_modified: Value of the Last-Modified header or None
+        :param body: Body of the response as bytes
+        :return:
+        """
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                                     (_cache_key(url, params), etag, last_modified, body))
+
+    def close(self):
+        """
+        Closes the database
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
+
+
+def _cache_key(url, params):
+    """
+    Creates the key of a request that does not depend on the order of the parameters
+    :param url: URL of the request
+    :param params: Parameters of the request
+    :return: String identifying the request
+    """
+    return url + "?" + json.dumps({key: str(value) for key, value in (params or {}).items()}, sort_keys=True)
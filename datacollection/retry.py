@@ -0,0 +1,113 @@
+import random
+import threading
+
+import requests
+
+# Server errors and timeouts that usually disappear if the same request is sent again later
+RETRYABLE_STATUS_CODES = frozenset([408, 429, 500, 502, 503, 504])
+# Connection resets, timeouts and responses that were cut off while they were read
+RETRYABLE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError)
+
+
+class RetryPolicy:
+    """
+    The class RetryPolicy decides whether and after which delay a failed request is sent again. The delay grows
+    exponentially with the number of attempts of the request and is jittered, so that concurrent requests that failed
+    at the same time are not sent again at the same time. Each request may be retried max_retries times, the retries
+    of all requests together are limited by the budget, so that a long outage ends the collection instead of retrying
+    forever. The retries and the time spent waiting are counted per end point.
+    """
+
+    def __init__(self, max_retries=10, backoff=1.0, max_backoff=120.0, budget=None):
+        """
+        Constructor
+        :param max_retries: Number of times a single request is sent again before it fails
+        :param backoff: Delay in seconds before the first retry, it doubles with every further attempt
+        :param max_backoff: Upper bound of the delay in seconds
+        :param budget: Number of retries of all requests together or None for no limit
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+        self._statistics = {}
+        self._lock = threading.Lock()
+
+    def is_retryable_status(self, status_code):
+        """
+        Whether a response with the status code can succeed if the request is sent again
+        :param status_code: HTTP status code of the response
+        :return: Boolean
+        """
+        return status_code in RETRYABLE_STATUS_CODES
+
+    def is_retryable_exception(self, exception):
+        """
+        Whether a request that raised the exception can succeed if it is sent again
+        :param exception: Exception raised while sending the request or reading the response
+        :return: Boolean
+        """
+        return isinstance(exception, RETRYABLE_EXCEPTIONS)
+
+    def record_request(self, endpoint):
+        """
+        Counts a request that is sent to an end point, including retries
+        :param endpoint: Name of the end point
+        :return:
+        """
+        with self._lock:
+            self.__statistics(endpoint)["requests"] += 1
+
+    def next_delay(self, endpoint, attempt, retry_after=None):
+        """
+        Determines the delay before a failed request is sent again and counts the retry
+        :param endpoint: Name of the end point
+        :param attempt: Number of the retry of the request, starting at 1
+        :param retry_after: Delay in seconds the server asked for, e.g. by a Retry-After header, or None
+        :return: Delay in seconds or None if the request must not be retried anymore
+        """
+        with self._lock:
+            if attempt > self.max_retries or self.budget is not None and self.budget <= 0:
+                return None
+            if self.budget is not None:
+                self.budget -= 1
+            if retry_after is not None:
+                # The server knows when the request is accepted again, the jitter only spreads concurrent requests
+                delay = retry_after + random.uniform(0, 1)
+            else:
+                # Equal jitter, the delay is at least half of the exponential backoff
+                cap = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                delay = cap / 2 + random.uniform(0, cap / 2)
+            statistics = self.__statistics(endpoint)
+            statistics["retries"] += 1
+            statistics["sleep_seconds"] += delay
+            return delay
+
+    def record_sleep(self, endpoint, seconds):
+        """
+        Counts time a request waited for a rate limit that was hit by another request
+        :param endpoint: Name of the end point
+        :param seconds: Time waited in seconds
+        :return:
+        """
+        with self._lock:
+            self.__statistics(endpoint)["sleep_seconds"] += seconds
+
+    def statistics(self):
+        """
+        Getter for the requests, retries and seconds spent waiting per end point
+        :return: Dictionary mapping each end point to a dictionary with the keys requests, retries and sleep_seconds
+        """
+        with self._lock:
+            return {endpoint: dict(statistics) for endpoint, statistics in self._statistics.items()}
+
+    def __statistics(self, endpoint):
+        """
+        Returns the counters of an end point, the lock has to be held
+        :param endpoint: Name of the end point
+        :return: Dictionary with the keys requests, retries and sleep_seconds
+        """
+        if endpoint not in self._statistics:
+            self._statistics[endpoint] = {"requests": 0, "retries": 0, "sleep_seconds": 0.0}
+        return self._statistics[endpoint]
@@ -0,0 +1,79 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+
+
+class UserCache:
+    """
+    The class UserCache stores the profiles of GitHub users, including their public mail address, in a sqlite database
+    on disk. The same database can be used by the GitHubRepo objects of several repositories, so that a contributor of
+    all of them is only requested once. Profiles expire after the ttl. Users that were not found, e.g. deleted
+    accounts, are stored as well and expire after the negative_ttl, so they are not requested on every run either.
+    """
+
+    def __init__(self, file, ttl=timedelta(days=30), negative_ttl=timedelta(days=7)):
+        """
+        Constructor, creates the database if it does not exist yet
+        :param file: Name of the sqlite database file
+        :param ttl: Time after which a stored profile is requested again
+        :param negative_ttl: Time after which a user that was not found is requested again
+        """
+        self.file = file
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        # The cache is shared by concurrent lookups, so all accesses of the connection are serialized
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS users (login TEXT PRIMARY KEY, profile TEXT, "
+                                     "fetched_at REAL)")
+
+    def get(self, login):
+        """
+        Looks up the stored profile of a user
+        :param login: Login name of the user
+        :return: Tuple (found, profile as dictionary or None if not found) or None if the user is not stored or expired
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT profile, fetched_at FROM users WHERE login = ?",
+                                           (login,)).fetchone()
+        if row is None:
+            return None
+        profile, fetched_at = row
+        ttl = self.ttl if profile is not None else self.negative_ttl
+        if time.time() - fetched_at > ttl.total_seconds():
+            return None
+        self.hits += 1
+        return profile is not None, json.loads(profile) if profile is not None else None
+
+    def put(self, login, profile):
+        """
+        Stores the profile of a user, replacing the previously stored profile
+        :param login: Login name of the user
+        :param profile: Dictionary of the profile or None if the user was not found
+        :return:
+        """
+        self.put_many({login: profile})
+
+    def put_many(self, profiles):
+        """
+        Stores the profiles of several users in a single transaction
+        :param profiles: Dictionary mapping login names to profiles or None for users that were not found
+        :return:
+        """
+        fetched_at = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?)",
+                                         [(login, json.dumps(profile) if profile is not None else None, fetched_at)
+                                          for login, profile in profiles.items()])
+
+    def close(self):
+        """
+        Closes the database
+        :return:
+        """
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,6 @@
+import datacollection.git_information as git_information
+
+urls = ["path_to_local_git_repo_1", "path_to_local_git_repo_2", "path_to_local_git_repo_3"]
+results = git_information.collect_commit_logs(urls, saving_directory="path_to_where_logs_will_be_saved", max_workers=3)
+for result in results:
+    print(result["repository"], result["status"], result["error"])
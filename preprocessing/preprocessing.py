@@ -16,7 +16,8 @@ def merge_logs(issue_tracking_info,  # DataFrame built from datacollection.githu
                issue_type='all',  # alternatively: 'pull request', 'issue', 'issue_pull'
                git_originator_mail='commit:committer:mail',  # alternatively: 'commit:author:mail'
                git_timestamp='timestamp:committer',  # alternatively: 'timestamp:author'
-               git_originator_name='commit:committer:name'):  # alternatively: 'commit:author:name'
+               git_originator_name='commit:committer:name',  # alternatively: 'commit:author:name'
+               issue_links=None):  # DataFrame built from datacollection.git_information.get_commit_information
     """
     Merges the different csv files obtained by datacollection.git_information and datacollection.github_information into
     one processable log
@@ -32,6 +33,8 @@ def merge_logs(issue_tracking_info,  # DataFrame built from datacollection.githu
     committer or author
     :param git_originator_name: one of the originator name columns that may be selected, in most cases the email of
     committer or author
+    :param issue_links: Optional DataFrame containing the links from commit hashes to issue numbers (written to
+    issue_links_filename by get_commit_information), if given it is used instead of the issue:number column of git_log
     :return pd.DataFrame that is a combination of @issue_tracking_log and @git_log
     """
 
@@ -51,11 +54,18 @@ def merge_logs(issue_tracking_info,  # DataFrame built from datacollection.githu
     new_issue_log['timestamp'] = [datetime.strptime(dt, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.utc)
                                   for dt in new_issue_log['timestamp']]
 
-    # The issue number is stored in a list as a single commit can belong to multiple issues
-    # The list is read as str and thus has to be converted to a list
-    git_log['issue:number'] = [ast.literal_eval(s) for s in git_log['issue:number']]
-    # A single commit may belong to multiple issues and therefore each issue gets its own event
-    git_log = git_log.explode('issue:number').reset_index(drop=True)
+    if issue_links is not None:
+        # A single commit may belong to multiple issues and therefore each link to an issue gets its own event
+        git_log = git_log.drop(columns=['issue:number']).merge(issue_links[['commit:hash', 'issue:number']],
+                                                               on='commit:hash', how='left')
+    else:
+        # The issue number is stored in a list as a single commit can belong to multiple issues
+        # The list is read as str and thus has to be converted to a list
+        # Logs in a typed output format (parquet, feather) already contain the lists
+        git_log['issue:number'] = [ast.literal_eval(s) if isinstance(s, str) else list(s)
+                                   for s in git_log['issue:number']]
+        # A single commit may belong to multiple issues and therefore each issue gets its own event
+        git_log = git_log.explode('issue:number').reset_index(drop=True)
 
     # Order the columns
     new_commit_log = git_log[['issue:number', 'timestamp:author:date', 'timestamp:committer:date', 'commit:message',
@@ -63,11 +73,13 @@ def merge_logs(issue_tracking_info,  # DataFrame built from datacollection.githu
                               'commit:committer:mail', 'commit:author:mail', 'commit:hash', 'activity']]
 
     # Here the timestamps also have to be put into an appropriate format and converted into the same format
-    new_commit_log['timestamp:committer'] = [datetime.fromisoformat(date)
-                                             for date in list(new_commit_log['timestamp:committer'])]
-
-    new_commit_log['timestamp:author'] = [datetime.fromisoformat(date)
-                                          for date in list(new_commit_log['timestamp:author'])]
+    # Logs in a typed output format (parquet, feather) store them as seconds since epoch that need no parsing
+    for timestamp_column in ['timestamp:committer', 'timestamp:author']:
+        if pd.api.types.is_integer_dtype(new_commit_log[timestamp_column]):
+            new_commit_log[timestamp_column] = pd.to_datetime(new_commit_log[timestamp_column], unit='s', utc=True)
+        else:
+            new_commit_log[timestamp_column] = [datetime.fromisoformat(date)
+                                                for date in list(new_commit_log[timestamp_column])]
 
     # Combine the issue tracking and the git log and rename the columns
     log = pd.concat([new_issue_log.rename(columns={'author:name': 'originator:name', 'author:mail': 'originator:mail'}),
@@ -337,7 +337,12 @@ def import_log(log_df: pd.DataFrame,
     """
     log_csv = log_df.copy()  # dataframe_utils.convert_timestamp_columns_in_df(log_df)
 
-    log_csv[timestamp_key] = [datetime.fromisoformat(ts) if type(ts) == str else ts for ts in log_csv[timestamp_key]]
+    if pd.api.types.is_integer_dtype(log_csv[timestamp_key]):
+        # Typed logs (parquet, feather) store the timestamps as seconds since epoch
+        log_csv[timestamp_key] = pd.to_datetime(log_csv[timestamp_key], unit='s', utc=True)
+    elif not pd.api.types.is_datetime64_any_dtype(log_csv[timestamp_key]):
+        log_csv[timestamp_key] = [datetime.fromisoformat(ts) if type(ts) == str else ts
+                                  for ts in log_csv[timestamp_key]]
     log_csv = log_csv.sort_values(timestamp_key)
     parameters = {log_converter.Variants.TO_EVENT_LOG.value.Parameters.CASE_ID_KEY: case_key}
     event_log = log_converter.apply(log_csv, parameters=parameters)